@@ -0,0 +1,61 @@
+"""Benchmark dei formati di output dei frame estratti.
+
+Misura frame/s e byte/frame di ogni opzione di FRAME_FORMATS su frame
+sintetici 1080p (gradiente + rumore, simile a un frame video reale).
+
+Uso: python benchmarks/bench_frame_formats.py [--frames 30] [--size 1920x1080]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tool_logic.frames import _frame_write_params, _write_frame  # noqa: E402
+
+CASES = [
+    ("png", None), ("png", 0), ("png", 9),
+    ("jpg", 95), ("jpg", 80),
+    ("webp", 90),
+    ("bmp", None),
+    ("npy", None),
+]
+
+def make_frames(count, w, h):
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, w, dtype=np.float32)
+    y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+    base = np.stack([(x + y) / 2, np.broadcast_to(x, (h, w)), np.broadcast_to(y, (h, w))], axis=2)
+    frames = []
+    for i in range(count):
+        noise = rng.normal(0, 12, (h, w, 3))
+        frames.append(np.clip(base + noise + i, 0, 255).astype(np.uint8))
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--size", default="1920x1080")
+    args = parser.parse_args()
+
+    w, h = map(int, args.size.split("x"))
+    frames = make_frames(args.frames, w, h)
+
+    print(f"{'formato':<10}{'qualità':>8}{'frame/s':>10}{'KB/frame':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for image_format, quality in CASES:
+            ext, params = _frame_write_params(image_format, quality)
+            paths = [os.path.join(tmp, f"{image_format}_{quality}_{i:06d}{ext}") for i in range(len(frames))]
+            start = time.perf_counter()
+            for path, frame in zip(paths, frames):
+                _write_frame(path, frame, params)
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(p) for p in paths) / len(paths)
+            label = "default" if quality is None else str(quality)
+            print(f"{image_format:<10}{label:>8}{len(frames) / elapsed:>10.1f}{size / 1024:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Tempo di import di tool_logic misurato con python -X importtime.
+
+Esegue l'import in processi separati (cache di sistema calda) e riporta il
+tempo cumulativo minimo e mediano, più l'elenco delle librerie pesanti
+caricate all'import: dovrebbe essere vuoto, perché OpenCV, NumPy e PIL
+vengono importati al primo utilizzo e customtkinter/tkinter solo dalle GUI.
+
+Uso: python benchmarks/bench_import_time.py [--runs 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("cv2", "numpy", "PIL", "tkinter", "customtkinter")
+
+def import_once():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import tool_logic"],
+                            cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    cumulative = None
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        name = parts[2]
+        if name == "tool_logic":
+            cumulative = int(parts[1])
+        if name.split(".")[0] in HEAVY_MODULES:
+            loaded.add(name.split(".")[0])
+    return cumulative, loaded
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    times = []
+    loaded = set()
+    for _ in range(args.runs):
+        cumulative, modules = import_once()
+        times.append(cumulative / 1000)
+        loaded |= modules
+
+    print(f"import tool_logic: min {min(times):.1f} ms, mediana {statistics.median(times):.1f} ms ({args.runs} run)")
+    print(f"librerie pesanti importate: {', '.join(sorted(loaded)) or 'nessuna'}")
+
+if __name__ == "__main__":
+    main()
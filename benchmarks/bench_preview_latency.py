@@ -0,0 +1,152 @@
+"""Latenza della preview effetti: frame intero contro proxy a risoluzione di preview.
+
+Per ogni formato (PNG, JPEG) misura il caricamento del frame e il costo di un
+"tick" di slider: effetti + riduzione a PREVIEW_SIZE (la parte di
+create_preview che non richiede Tk). Il percorso a frame intero è quello
+precedente (decodifica completa, effetti a piena risoluzione); il proxy
+usa load_preview_proxy e il blur scalato.
+
+Simula poi un trascinamento di slider (--events eventi a --hz) con un
+finto event loop al posto di Tk e misura la latenza slider → consegna della
+preview: render sincrono nel thread della GUI (comportamento precedente)
+contro PreviewRenderer, che fonde le richieste e rende fuori dal thread.
+"ritardo eventi" è quanto il thread della GUI arriva in ritardo a gestire
+gli eventi dello slider (la percezione di scatti).
+
+Uso: python benchmarks/bench_preview_latency.py [--size 3840x2160] [--ticks 20] [--events 60] [--hz 60]
+"""
+import argparse
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tool_logic import (PREVIEW_SIZE, PreviewRenderer, apply_effects_to_single_image_for_preview,  # noqa: E402
+                        load_preview_proxy)
+
+EFFECTS = ["posterize", "blur", "contrast", "brightness"]
+
+def make_frame(w, h):
+    # Gradiente con rumore: comprimibile ma non banale da decodificare
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, w, dtype=np.float32)
+    y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    noise = rng.normal(0, 12, size=(h, w, 3))
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8))
+
+def thumbnail(img):
+    preview = img.copy()
+    preview.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.Resampling.LANCZOS)
+    return preview
+
+def tick_times(img, scale, ticks):
+    times = []
+    for i in range(ticks):
+        sliders = {"posterize": 40, "blur": 10 + i, "contrast": 60, "brightness": 55}
+        start = time.perf_counter()
+        thumbnail(apply_effects_to_single_image_for_preview(img, EFFECTS, sliders, scale=scale))
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def render_tick(img, scale, value):
+    sliders = {"posterize": 40, "blur": value % 100, "contrast": 60, "brightness": 55}
+    return thumbnail(apply_effects_to_single_image_for_preview(img, EFFECTS, sliders, scale=scale))
+
+def drag_sync(img, scale, events, hz):
+    """Ogni evento dello slider rende la preview nel thread della GUI"""
+    start = time.perf_counter()
+    latencies, lateness = [], []
+    for i in range(events):
+        event_time = start + i / hz
+        now = time.perf_counter()
+        if now < event_time:
+            time.sleep(event_time - now)
+        lateness.append(time.perf_counter() - event_time)
+        render_tick(img, scale, i)
+        latencies.append(time.perf_counter() - event_time)
+    return events, latencies, lateness
+
+def drag_async(img, scale, events, hz):
+    """Gli eventi registrano solo la richiesta; il worker rende l'ultima"""
+    loop = queue.Queue()
+    painted = []
+    event_times = {}
+    renderer = PreviewRenderer(lambda i: (i, render_tick(img, scale, i)),
+                               lambda result, ms: painted.append((result[0], time.perf_counter())),
+                               loop.put)
+
+    def run_loop(until):
+        # Esegue le callback (root.after) fino all'istante indicato
+        while True:
+            timeout = until - time.perf_counter()
+            if timeout <= 0:
+                return
+            try:
+                loop.get(timeout=timeout)()
+            except queue.Empty:
+                return
+
+    start = time.perf_counter()
+    lateness = []
+    for i in range(events):
+        event_time = start + i / hz
+        run_loop(event_time)
+        lateness.append(max(0.0, time.perf_counter() - event_time))
+        event_times[i] = event_time
+        renderer.request(i)
+    while not painted or painted[-1][0] != events - 1:
+        loop.get()()
+    renderer.close()
+    return renderer.renders, [t - event_times[i] for i, t in painted], lateness
+
+def report_drag(label, result, events):
+    renders, latencies, lateness = result
+    print(f"{label:28s} render {renders:3d}/{events}, latenza mediana {statistics.median(latencies) * 1000:7.1f} ms, "
+          f"ultima {latencies[-1] * 1000:7.1f} ms, ritardo eventi max {max(lateness) * 1000:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="3840x2160")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--events", type=int, default=60)
+    parser.add_argument("--hz", type=float, default=60)
+    args = parser.parse_args()
+    w, h = map(int, args.size.split("x"))
+
+    frame = make_frame(w, h)
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ("png", "jpg"):
+            path = os.path.join(tmp, f"frame.{ext}")
+            frame.save(path)
+
+            start = time.perf_counter()
+            full = Image.open(path).convert("RGB")
+            full_load = (time.perf_counter() - start) * 1000
+            full_tick = tick_times(full, 1.0, max(1, args.ticks // 4))
+
+            start = time.perf_counter()
+            proxy, scale = load_preview_proxy(path)
+            proxy_load = (time.perf_counter() - start) * 1000
+            proxy_tick = tick_times(proxy, scale, args.ticks)
+
+            print(f"{ext:4s} frame intero: caricamento {full_load:7.1f} ms, tick {full_tick:7.1f} ms")
+            print(f"{ext:4s} proxy {proxy.size[0]}x{proxy.size[1]}: caricamento {proxy_load:7.1f} ms, "
+                  f"tick {proxy_tick:7.2f} ms (scala {scale:.3f})")
+
+        print(f"\ntrascinamento slider: {args.events} eventi a {args.hz:.0f} Hz")
+        events = args.events
+        full_events = max(2, events // 6)
+        report_drag("frame intero, sincrono", drag_sync(full, 1.0, full_events, args.hz), full_events)
+        report_drag("frame intero, worker", drag_async(full, 1.0, full_events, args.hz), full_events)
+        report_drag("proxy, sincrono", drag_sync(proxy, scale, events, args.hz), events)
+        report_drag("proxy, worker", drag_async(proxy, scale, events, args.hz), events)
+
+if __name__ == "__main__":
+    main()
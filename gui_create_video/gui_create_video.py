@@ -1,9 +1,7 @@
-import os
-import shutil
 import threading
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
-from tool_logic import interleave_folders, create_video_from_folder
+from tool_logic import collect_interleaved_frames, create_video_from_files
 from pathlib import Path
 # ========== SETUP GLOBALE (SOLO PER QUESTO TOOL) ==========
 ctk.set_appearance_mode("light")
@@ -11,6 +9,13 @@ ctk.set_default_color_theme("blue")
 
 folders = []
 
+# Voce del menu backend -> (backend, encoder ffmpeg)
+backend_map = {
+    "FFmpeg H.264": ("ffmpeg", "libx264"),
+    "FFmpeg H.265": ("ffmpeg", "libx265"),
+    "OpenCV": ("opencv", "libx264"),
+}
+
 def add_folder(folder_list):
     folder = filedialog.askdirectory(title="Seleziona Cartella Frame")
     if folder:
@@ -21,7 +26,7 @@ def clear_folders(folder_list):
     folders.clear()
     folder_list.delete("1.0", "end")
 
-def run_merge_thread(root, btn_merge, progress_var, entry_fps_merge, combo_resolution, combo_output_format):
+def run_merge_thread(root, btn_merge, progress_var, entry_fps_merge, combo_resolution, combo_output_format, combo_backend, combo_preset, entry_crf):
     if not folders:
         messagebox.showerror("Errore", "Nessuna cartella selezionata")
         return
@@ -35,11 +40,22 @@ def run_merge_thread(root, btn_merge, progress_var, entry_fps_merge, combo_resol
             root.after(0, lambda: messagebox.showerror("Errore", "FPS non valido"))
             root.after(0, lambda: btn_merge.configure(state="normal"))
             return
+        
+        try:
+            crf = int(entry_crf.get())
+        except ValueError:
+            root.after(0, lambda: messagebox.showerror("Errore", "CRF non valido"))
+            root.after(0, lambda: btn_merge.configure(state="normal"))
+            return
             
         resolution_full = combo_resolution.get()
         resolution = resolution_full.split(' ')[0]
         output_format = combo_output_format.get().lower()
         
+        # Backend di scrittura: ffmpeg ripiega su OpenCV se non è installato
+        backend, encoder = backend_map.get(combo_backend.get(), ("opencv", "libx264"))
+        preset = combo_preset.get()
+        
         codec_map = {
             "mp4": ("mp4v", "*.mp4"),
             "avi": ("XVID", "*.avi"),
@@ -60,31 +76,32 @@ def run_merge_thread(root, btn_merge, progress_var, entry_fps_merge, combo_resol
             root.after(0, lambda: progress_var.set(0))
             return
             
-        tmp_folder = "frames_interleaved_temp"
-        shutil.rmtree(tmp_folder, ignore_errors=True)
-        os.makedirs(tmp_folder, exist_ok=True)
+        # 2. Interfoliazione: lista dei frame sorgente in ordine casuale (nessuna copia su disco)
+        frames = collect_interleaved_frames(folders)
         
-        # 2. Interleaving (copia e rimescola frame) - Copia al 50%
-        def interleave_progress(value):
-            root.after(0, lambda: progress_var.set(value / 200)) # Copia fino al 50%
-            
-        interleave_folders(folders, tmp_folder, progress_callback=interleave_progress)
-        
-        # 3. Creazione del video finale - Video dal 50% al 100%
+        # 3. Creazione del video leggendo i frame direttamente dalle cartelle sorgente
         ext = Path(out_path_video).suffix[1:].lower()
         codec = codec_map.get(ext, ("mp4v", ""))[0]
         
         def video_progress(value):
-            root.after(0, lambda: progress_var.set(50 + (value / 200))) 
+            root.after(0, lambda: progress_var.set(value / 100))
             
-        success = create_video_from_folder(tmp_folder, out_path_video, fps, resolution, codec, progress_callback=video_progress)
-        
-        shutil.rmtree(tmp_folder, ignore_errors=True) 
+        stats = {}
+        # L'ordine casuale cambia a ogni esecuzione: non c'è nulla da riprendere
+        success = create_video_from_files(frames, out_path_video, fps, resolution, codec,
+                                          progress_callback=video_progress, stats=stats,
+                                          backend=backend, encoder=encoder, preset=preset, crf=crf,
+                                          resume=False)
 
         if success:
-            root.after(0, lambda: messagebox.showinfo("Completato", f"Video creato in:\n{out_path_video}"))
+            timing = (f"Backend: {stats['backend']}\n"
+                      f"Decodifica: {stats['decode_s']:.1f}s (attesa {stats['wait_s']:.1f}s), codifica: {stats['encode_s']:.1f}s")
+            root.after(0, lambda: messagebox.showinfo("Completato", f"Video creato in:\n{out_path_video}\n\n{timing}"))
         else:
-            root.after(0, lambda: messagebox.showerror("Errore", "Errore nella creazione del video"))
+            message = "Errore nella creazione del video"
+            if stats.get("error"):
+                message += f":\n{stats['error']}"
+            root.after(0, lambda: messagebox.showerror("Errore", message))
         
         root.after(0, lambda: btn_merge.configure(state="normal"))
         root.after(0, lambda: progress_var.set(0))
@@ -129,6 +146,21 @@ def create_create_video_gui():
     combo_output_format.set("MP4")
     combo_output_format.grid(row=1, column=1, padx=5, pady=5)
 
+    ctk.CTkLabel(frame_settings, text="Encoder:").grid(row=1, column=2, padx=5, pady=5)
+    combo_backend = ctk.CTkComboBox(frame_settings, values=list(backend_map), width=180)
+    combo_backend.set("FFmpeg H.264")
+    combo_backend.grid(row=1, column=3, padx=5, pady=5)
+
+    ctk.CTkLabel(frame_settings, text="Preset:").grid(row=2, column=0, padx=5, pady=5)
+    combo_preset = ctk.CTkComboBox(frame_settings, values=["ultrafast", "veryfast", "fast", "medium", "slow"], width=100)
+    combo_preset.set("medium")
+    combo_preset.grid(row=2, column=1, padx=5, pady=5)
+
+    ctk.CTkLabel(frame_settings, text="CRF (qualità):").grid(row=2, column=2, padx=5, pady=5)
+    entry_crf = ctk.CTkEntry(frame_settings, width=80)
+    entry_crf.insert(0, "23")
+    entry_crf.grid(row=2, column=3, padx=5, pady=5, sticky="w")
+
     # Barra di Progresso
     progress_var = ctk.DoubleVar()
     progress_bar = ctk.CTkProgressBar(root, variable=progress_var)
@@ -137,7 +169,7 @@ def create_create_video_gui():
 
     # Pulsante Avvio
     btn_merge = ctk.CTkButton(root, text="🎥 Crea Video (Interfolia)", 
-        command=lambda: run_merge_thread(root, btn_merge, progress_var, entry_fps_merge, combo_resolution, combo_output_format))
+        command=lambda: run_merge_thread(root, btn_merge, progress_var, entry_fps_merge, combo_resolution, combo_output_format, combo_backend, combo_preset, entry_crf))
     btn_merge.pack(pady=10)
 
     root.mainloop()
@@ -2,8 +2,8 @@ import os
 import threading
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
-from PIL import Image
-from tool_logic import apply_effects, create_preview, apply_effects_to_single_image_for_preview
+from tool_logic import (apply_effects, create_preview, apply_effects_to_single_image_for_preview, load_preview_proxy,
+                        fit_preview, PreviewRenderer, PREVIEW_SIZE, IMAGE_EXTENSIONS)
 
 # ========== SETUP GLOBALE (SOLO PER QUESTO TOOL) ==========
 ctk.set_appearance_mode("light")
@@ -11,7 +11,9 @@ ctk.set_default_color_theme("blue")
 
 effect_folder = None
 current_preview_img = None 
+current_preview_scale = 1.0 # Rapporto proxy / frame originale (per il blur)
 global_root_ref = None # Riferimento alla root per l'accesso dai thread
+preview_renderer = None # Worker che calcola la preview fuori dal thread di Tk
 
 def get_slider_vars():
     # Helper per raccogliere i valori degli slider
@@ -23,9 +25,24 @@ def get_slider_vars():
         "brightness": slider_brightness.get()
     }
 
-def update_preview_effect(preview_label_effect, sliders):
-    global current_preview_img
+def render_preview_effect(img, effects, sliders, scale):
+    # Eseguita nel worker della preview: effetti sul proxy e riduzione finale
+    img_processed = apply_effects_to_single_image_for_preview(img, effects, sliders, scale=scale)
+    return fit_preview(img_processed, PREVIEW_SIZE)
+
+def show_preview_effect(preview_label_effect, latency_label_effect, result, latency_ms):
+    # Eseguita nel thread della GUI con l'ultima preview calcolata
+    if isinstance(result, Exception):
+        preview_label_effect.configure(text=f"Errore preview: {result}")
+        return
     
+    # Mostra preview con CTkImage
+    preview_ctk = create_preview(result, PREVIEW_SIZE)
+    preview_label_effect.configure(image=preview_ctk, text="") # Rimuovi il testo della label
+    preview_label_effect.image = preview_ctk 
+    latency_label_effect.configure(text=f"Aggiornamento preview: {latency_ms:.0f} ms")
+
+def update_preview_effect(preview_label_effect, sliders):
     if current_preview_img is None:
         preview_label_effect.configure(text="Seleziona prima una cartella valida per la preview.")
         return
@@ -38,19 +55,15 @@ def update_preview_effect(preview_label_effect, sliders):
     if var_contrast.get(): selected_effects.append("contrast")
     if var_brightness.get(): selected_effects.append("brightness")
     
-    # L'elaborazione della preview è veloce (su immagine piccola), la manteniamo nel thread GUI
-    img_processed = apply_effects_to_single_image_for_preview(current_preview_img, selected_effects, sliders)
-    
-    # Mostra preview con CTkImage
-    preview_ctk = create_preview(img_processed, 250)
-    preview_label_effect.configure(image=preview_ctk, text="") # Rimuovi il testo della label
-    preview_label_effect.image = preview_ctk 
+    # Il render avviene nel worker sul proxy a risoluzione di preview: qui si
+    # registra solo la richiesta, che sostituisce quelle non ancora calcolate
+    preview_renderer.request(current_preview_img, selected_effects, sliders, current_preview_scale)
 
 # Funzione per il caricamento dell'immagine (eseguita nel thread)
 def load_preview_image(folder, preview_label_effect, root):
-    global current_preview_img
+    global current_preview_img, current_preview_scale
     
-    files = sorted([f for f in os.listdir(folder) if f.lower().endswith((".png", ".jpg", ".jpeg"))])
+    files = sorted([f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS)])
     
     if not files:
         root.after(0, lambda: preview_label_effect.configure(text="Nessun file immagine nella cartella"))
@@ -60,7 +73,8 @@ def load_preview_image(folder, preview_label_effect, root):
     img_path = os.path.join(folder, files[0])
     
     try:
-        current_preview_img = Image.open(img_path).convert("RGB")
+        # Decodifica unica direttamente alla risoluzione della preview
+        current_preview_img, current_preview_scale = load_preview_proxy(img_path, PREVIEW_SIZE)
         # Aggiorna la preview nel thread della GUI
         root.after(0, lambda: update_preview_effect(preview_label_effect, get_slider_vars()))
     except Exception as e:
@@ -80,7 +94,7 @@ def choose_folder_effect(entry_effect_folder, preview_label_effect, root):
         # Avvia il caricamento in un thread separato
         threading.Thread(target=load_preview_image, args=(folder, preview_label_effect, root), daemon=True).start()
 
-def run_effects_thread(root, btn_apply_effects, progress_var_effect, var_overwrite):
+def run_effects_thread(root, btn_apply_effects, progress_var_effect, var_overwrite, entry_workers, var_cache):
     if not effect_folder or not os.path.isdir(effect_folder):
         messagebox.showerror("Errore", "Seleziona una cartella valida")
         return
@@ -96,20 +110,34 @@ def run_effects_thread(root, btn_apply_effects, progress_var_effect, var_overwri
         messagebox.showerror("Errore", "Nessun effetto selezionato")
         return
     
+    try:
+        workers = int(entry_workers.get())
+    except ValueError:
+        messagebox.showerror("Errore", "Numero di worker non valido")
+        return
+    
     btn_apply_effects.configure(state="disabled")
     
     def effects_task():
         slider_values = get_slider_vars()
         overwrite = var_overwrite.get()
+        use_cache = var_cache.get()
+        stats = {}
         
         def progress_update(value):
             root.after(0, lambda: progress_var_effect.set(value / 100))
         
+        # Con la cache la scelta casuale dei frame è ripetibile (seed fisso),
+        # così rieseguendo con gli stessi slider tutti i frame sono già in cache
         out_folder = apply_effects(effect_folder, selected_effects, slider_values, 
                                  probability=0.7, overwrite=overwrite,
-                                 progress_callback=progress_update)
+                                 progress_callback=progress_update, workers=workers,
+                                 seed=0 if use_cache else None, cache=use_cache, stats=stats)
         
-        root.after(0, lambda: messagebox.showinfo("Completato", f"Effetti applicati.\nCartella output: {out_folder}"))
+        message = f"Effetti applicati.\nCartella output: {out_folder}"
+        if use_cache:
+            message += f"\nCache: {stats.get('cache_hits', 0)} hit, {stats.get('cache_misses', 0)} miss"
+        root.after(0, lambda: messagebox.showinfo("Completato", message))
         root.after(0, lambda: btn_apply_effects.configure(state="normal"))
         root.after(0, lambda: progress_var_effect.set(0))
     
@@ -119,7 +147,7 @@ def run_effects_thread(root, btn_apply_effects, progress_var_effect, var_overwri
 def create_effects_gui():
     global var_posterize, var_bw, var_blur, var_contrast, var_brightness
     global slider_posterize, slider_bw, slider_blur, slider_contrast, slider_brightness
-    global global_root_ref
+    global global_root_ref, preview_renderer
     
     root = ctk.CTk()
     global_root_ref = root # Salva il riferimento
@@ -145,12 +173,24 @@ def create_effects_gui():
     var_overwrite = ctk.BooleanVar()
     ctk.CTkCheckBox(frame_effect_left, text="Sovrascrivi file originali", variable=var_overwrite).pack(pady=5)
 
+    # Checkbox Cache risultati
+    var_cache = ctk.BooleanVar()
+    ctk.CTkCheckBox(frame_effect_left, text="Cache risultati (scelta casuale ripetibile)", variable=var_cache).pack(pady=5)
+
+    # Numero di worker paralleli (default: numero di CPU)
+    frame_workers = ctk.CTkFrame(frame_effect_left)
+    frame_workers.pack(pady=5)
+    ctk.CTkLabel(frame_workers, text="Worker paralleli:").pack(side="left", padx=5)
+    entry_workers = ctk.CTkEntry(frame_workers, width=60)
+    entry_workers.insert(0, str(os.cpu_count() or 1))
+    entry_workers.pack(side="left", padx=5)
+
     # Frame Scrollable per Effetti e Slider
     frame_effects = ctk.CTkScrollableFrame(frame_effect_left, height=350)
     frame_effects.pack(fill="both", expand=True, padx=10, pady=10)
 
     # Helper per l'aggiornamento della preview con i parametri correnti
-    preview_update_cmd = lambda x: update_preview_effect(preview_label_effect, get_slider_vars())
+    preview_update_cmd = lambda *_: update_preview_effect(preview_label_effect, get_slider_vars())
 
     # Variabili
     var_posterize = ctk.BooleanVar()
@@ -196,6 +236,14 @@ def create_effects_gui():
     ctk.CTkLabel(frame_effect_right, text="PREVIEW", font=("Arial", 14, "bold")).pack(pady=10)
     preview_label_effect = ctk.CTkLabel(frame_effect_right, text="Seleziona cartella frame sorgente")
     preview_label_effect.pack(pady=10)
+    latency_label_effect = ctk.CTkLabel(frame_effect_right, text="")
+    latency_label_effect.pack()
+    
+    # Worker della preview: i risultati tornano nel thread della GUI con root.after
+    preview_renderer = PreviewRenderer(
+        render_preview_effect,
+        lambda result, latency_ms: show_preview_effect(preview_label_effect, latency_label_effect, result, latency_ms),
+        lambda fn: root.after(0, fn))
     
     # Inizializza la preview per mostrare il messaggio iniziale
     update_preview_effect(preview_label_effect, get_slider_vars())
@@ -207,7 +255,7 @@ def create_effects_gui():
     progress_bar_effect.set(0)
 
     btn_apply_effects = ctk.CTkButton(root, text="✨ Applica Effetti a Sequenza", 
-                                      command=lambda: run_effects_thread(root, btn_apply_effects, progress_var_effect, var_overwrite))
+                                      command=lambda: run_effects_thread(root, btn_apply_effects, progress_var_effect, var_overwrite, entry_workers, var_cache))
     btn_apply_effects.pack(pady=10)
 
     root.mainloop()
@@ -2,7 +2,7 @@ import os
 import threading
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
-from tool_logic import extract_frames, normalize_frame
+from tool_logic import extract_frames_batch, NORM_METHODS
 
 # ========== SETUP GLOBALE (SOLO PER QUESTO TOOL) ==========
 ctk.set_appearance_mode("light")
@@ -20,7 +20,7 @@ def clear_videos(video_list):
     videos.clear()
     video_list.delete("1.0", "end")
 
-def run_extract_thread(root, btn_extract, progress_var_extract, entry_fps, var_normalize, combo_norm_method, combo_resolution_extract):
+def run_extract_thread(root, btn_extract, progress_var_extract, entry_fps, var_normalize, combo_norm_method, combo_resolution_extract, combo_image_format, entry_quality):
     if not videos:
         messagebox.showerror("Errore", "Nessun video selezionato")
         return
@@ -37,32 +37,38 @@ def run_extract_thread(root, btn_extract, progress_var_extract, entry_fps, var_n
             root.after(0, lambda: messagebox.showerror("Errore", "FPS non valido"))
             root.after(0, lambda: btn_extract.configure(state="normal"))
             return
+        
+        # Qualità vuota = default di OpenCV per il formato scelto
+        quality_text = entry_quality.get().strip()
+        try:
+            quality = int(quality_text) if quality_text else None
+        except ValueError:
+            root.after(0, lambda: messagebox.showerror("Errore", "Qualità non valida"))
+            root.after(0, lambda: btn_extract.configure(state="normal"))
+            return
             
+        image_format = combo_image_format.get()
         normalize = var_normalize.get()
         norm_method = combo_norm_method.get()
         resolution = combo_resolution_extract.get()
         
         total_videos = len(videos)
-        saved_frames_total = 0
         
-        for idx, v in enumerate(videos):
-            video_name = os.path.splitext(os.path.basename(v))[0]
-            video_folder = os.path.join(out, video_name)
-            
-            def progress_update(value):
-                # Aggiorna la barra di progresso in base al video corrente
-                root.after(0, lambda: progress_var_extract.set(value / 100))
-            
-            saved_count = extract_frames(v, video_folder, fps=fps, normalize=normalize, 
-                             norm_method=norm_method, resolution=resolution, 
-                             progress_callback=progress_update)
-            saved_frames_total += saved_count
-            
-            # Reset della barra tra un video e l'altro (o alla fine se è l'ultimo)
-            if idx < total_videos - 1:
-                root.after(0, lambda: progress_var_extract.set(0))
+        def progress_update(value):
+            # Progresso complessivo su tutti i video elaborati in parallelo
+            root.after(0, lambda: progress_var_extract.set(value / 100))
+        
+        results = extract_frames_batch(list(videos), out, fps=fps, normalize=normalize,
+                                       norm_method=norm_method, resolution=resolution,
+                                       image_format=image_format, quality=quality,
+                                       progress_callback=progress_update)
+        saved_frames_total = sum(r["saved"] for r in results)
+        errors = [f"{os.path.basename(r['video'])}: {r['error']}" for r in results if r["error"]]
         
-        root.after(0, lambda: messagebox.showinfo("Completato", f"Estrazione completata da {total_videos} video.\nTotale frame salvati: {saved_frames_total} in:\n{out}"))
+        summary = f"Estrazione completata da {total_videos} video.\nTotale frame salvati: {saved_frames_total} in:\n{out}"
+        if errors:
+            summary += "\n\nErrori:\n" + "\n".join(errors)
+        root.after(0, lambda: messagebox.showinfo("Completato", summary))
         root.after(0, lambda: btn_extract.configure(state="normal"))
         root.after(0, lambda: progress_var_extract.set(0))
     
@@ -72,7 +78,7 @@ def run_extract_thread(root, btn_extract, progress_var_extract, entry_fps, var_n
 def create_extract_gui():
     root = ctk.CTk()
     root.title("🎞 Tool: Estrazione Frame Video")
-    root.geometry("600x650")
+    root.geometry("600x720")
     
     # Lista Video
     video_list = ctk.CTkTextbox(root, height=120)
@@ -98,7 +104,7 @@ def create_extract_gui():
     ctk.CTkCheckBox(root, text="Normalizza Frame", variable=var_normalize).pack(pady=(10, 5))
 
     ctk.CTkLabel(root, text="Metodo Normalizzazione:").pack()
-    combo_norm_method = ctk.CTkComboBox(root, values=["resize", "crop", "pad"], width=200)
+    combo_norm_method = ctk.CTkComboBox(root, values=list(NORM_METHODS), width=200)
     combo_norm_method.set("resize")
     combo_norm_method.pack(pady=5)
 
@@ -107,6 +113,19 @@ def create_extract_gui():
     combo_resolution_extract.set("1920x1080")
     combo_resolution_extract.pack(pady=5)
 
+    # Formato e qualità dei frame salvati
+    frame_format = ctk.CTkFrame(root)
+    frame_format.pack(pady=(10, 5))
+
+    ctk.CTkLabel(frame_format, text="Formato Frame:").grid(row=0, column=0, padx=5, pady=5)
+    combo_image_format = ctk.CTkComboBox(frame_format, values=["png", "jpg", "webp", "bmp", "npy"], width=100)
+    combo_image_format.set("png")
+    combo_image_format.grid(row=0, column=1, padx=5, pady=5)
+
+    ctk.CTkLabel(frame_format, text="Qualità (PNG 0-9, JPG/WebP 0-100):").grid(row=0, column=2, padx=5, pady=5)
+    entry_quality = ctk.CTkEntry(frame_format, width=60)
+    entry_quality.grid(row=0, column=3, padx=5, pady=5)
+
     # Barra di Progresso
     progress_var_extract = ctk.DoubleVar()
     progress_bar_extract = ctk.CTkProgressBar(root, variable=progress_var_extract)
@@ -115,7 +134,7 @@ def create_extract_gui():
 
     # Pulsante Avvio
     btn_extract = ctk.CTkButton(root, text="🎞 Estrai Frame", 
-        command=lambda: run_extract_thread(root, btn_extract, progress_var_extract, entry_fps, var_normalize, combo_norm_method, combo_resolution_extract))
+        command=lambda: run_extract_thread(root, btn_extract, progress_var_extract, entry_fps, var_normalize, combo_norm_method, combo_resolution_extract, combo_image_format, entry_quality))
     btn_extract.pack(pady=10)
 
     root.mainloop()
@@ -2,8 +2,8 @@ import os
 import threading
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
-from PIL import Image
-from tool_logic import apply_patterns, apply_pattern_to_image, create_preview
+from tool_logic import (apply_patterns, apply_pattern_to_image, create_preview, load_preview_proxy,
+                        fit_preview, PreviewRenderer, PREVIEW_SIZE, IMAGE_EXTENSIONS, MAX_FULL_TILE)
 
 # ========== SETUP GLOBALE (SOLO PER QUESTO TOOL) ==========
 ctk.set_appearance_mode("light")
@@ -11,6 +11,7 @@ ctk.set_default_color_theme("blue")
 
 pattern_folder = None
 current_preview_img_pattern = None
+preview_renderer = None # Worker che calcola la preview fuori dal thread di Tk
 
 def get_pattern_slider_vars():
     # Helper per raccogliere i valori degli slider
@@ -19,9 +20,28 @@ def get_pattern_slider_vars():
         "stripe": pattern_slider_stripe.get()
     }
 
-def update_preview_pattern(preview_label_pattern, sliders):
-    global current_preview_img_pattern
+def render_preview_pattern(img, patterns, sliders):
+    # Eseguita nel worker della preview: il tile viene generato direttamente
+    # alla dimensione del proxy invece che a dimensione piena, con lo stesso
+    # numero massimo di ripetizioni della texture salvata da "Genera"
+    if patterns:
+        img = apply_pattern_to_image(img.copy(), patterns, sliders, output_size=img.size,
+                                     max_tile=MAX_FULL_TILE)
+    return fit_preview(img, PREVIEW_SIZE)
+
+def show_preview_pattern(preview_label_pattern, latency_label_pattern, result, latency_ms):
+    # Eseguita nel thread della GUI con l'ultima preview calcolata
+    if isinstance(result, Exception):
+        preview_label_pattern.configure(text=f"Errore preview: {result}")
+        return
     
+    # Mostra preview con CTkImage
+    preview_ctk = create_preview(result, PREVIEW_SIZE)
+    preview_label_pattern.configure(image=preview_ctk, text="") # Rimuovi il testo della label
+    preview_label_pattern.image = preview_ctk
+    latency_label_pattern.configure(text=f"Aggiornamento preview: {latency_ms:.0f} ms")
+
+def update_preview_pattern(preview_label_pattern, sliders):
     if current_preview_img_pattern is None:
         preview_label_pattern.configure(text="Seleziona prima una cartella valida per la preview.")
         return
@@ -32,22 +52,15 @@ def update_preview_pattern(preview_label_pattern, sliders):
     if var_mirror.get(): selected_patterns.append("mirror")
     if var_stripe.get(): selected_patterns.append("stripe")
     
-    if not selected_patterns:
-        img_processed = current_preview_img_pattern.copy()
-    else:
-        # L'applicazione dei pattern avviene su una copia (veloce)
-        img_processed = apply_pattern_to_image(current_preview_img_pattern.copy(), selected_patterns, sliders)
-    
-    # Mostra preview con CTkImage
-    preview_ctk = create_preview(img_processed, 250)
-    preview_label_pattern.configure(image=preview_ctk, text="") # Rimuovi il testo della label
-    preview_label_pattern.image = preview_ctk
+    # Il render avviene nel worker: qui si registra solo la richiesta,
+    # che sostituisce quelle non ancora calcolate
+    preview_renderer.request(current_preview_img_pattern, selected_patterns, sliders)
 
 # Funzione per il caricamento dell'immagine (eseguita nel thread)
 def load_preview_image_pattern(folder, preview_label_pattern, root):
     global current_preview_img_pattern
     
-    files = sorted([f for f in os.listdir(folder) if f.lower().endswith((".png", ".jpg", ".jpeg"))])
+    files = sorted([f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS)])
     if not files:
         root.after(0, lambda: preview_label_pattern.configure(text="Nessun file immagine nella cartella"))
         current_preview_img_pattern = None
@@ -56,7 +69,8 @@ def load_preview_image_pattern(folder, preview_label_pattern, root):
     img_path = os.path.join(folder, files[0])
     
     try:
-        current_preview_img_pattern = Image.open(img_path).convert("RGB")
+        # I pattern sono geometrici: il proxy a risoluzione di preview dà lo stesso risultato visivo
+        current_preview_img_pattern, _ = load_preview_proxy(img_path, PREVIEW_SIZE)
         root.after(0, lambda: update_preview_pattern(preview_label_pattern, get_pattern_slider_vars()))
     except Exception as e:
         root.after(0, lambda: preview_label_pattern.configure(text=f"Errore caricamento: {e}"))
@@ -75,7 +89,7 @@ def choose_folder_pattern(entry_pattern_folder, preview_label_pattern, root):
         # Avvia il caricamento in un thread separato
         threading.Thread(target=load_preview_image_pattern, args=(folder, preview_label_pattern, root), daemon=True).start()
 
-def run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_var_pattern, static=True):
+def run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_var_pattern, var_cache, static=True):
     if not pattern_folder or not os.path.isdir(pattern_folder):
         messagebox.showerror("Errore", "Seleziona una cartella valida")
         return
@@ -94,17 +108,24 @@ def run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_
     
     def pattern_task():
         slider_values = get_pattern_slider_vars()
+        use_cache = var_cache.get()
+        stats = {}
         
         def progress_update(value):
             root.after(0, lambda: progress_var_pattern.set(value / 100))
         
+        # Con la cache anche le strisce sono ripetibili (seed fisso)
         result = apply_patterns(pattern_folder, selected_patterns, slider_values, 
-                                 sequence=not static, progress_callback=progress_update)
+                                 sequence=not static, progress_callback=progress_update,
+                                 seed=0 if use_cache else None, cache=use_cache, stats=stats)
         
         if static:
-            root.after(0, lambda: messagebox.showinfo("Completato", f"Texture statica salvata in:\n{result}"))
+            message = f"Texture statica salvata in:\n{result}"
         else:
-            root.after(0, lambda: messagebox.showinfo("Completato", f"Sequenza di pattern salvata in:\n{result}"))
+            message = f"Sequenza di pattern salvata in:\n{result}"
+        if use_cache:
+            message += f"\nCache: {stats.get('cache_hits', 0)} hit, {stats.get('cache_misses', 0)} miss"
+        root.after(0, lambda: messagebox.showinfo("Completato", message))
         
         root.after(0, lambda: btn_pattern_static.configure(state="normal"))
         root.after(0, lambda: btn_pattern_sequence.configure(state="normal"))
@@ -116,6 +137,7 @@ def run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_
 def create_patterns_gui():
     global var_tile, var_mirror, var_stripe
     global pattern_slider_tile, pattern_slider_stripe
+    global preview_renderer
     
     root = ctk.CTk()
     root.title("🖼 Tool: Pattern & Texture")
@@ -137,7 +159,7 @@ def create_patterns_gui():
     btn_choose_pattern.pack(pady=5)
     
     # Helper per l'aggiornamento della preview con i parametri correnti
-    preview_update_cmd = lambda x: update_preview_pattern(preview_label_pattern, get_pattern_slider_vars())
+    preview_update_cmd = lambda *_: update_preview_pattern(preview_label_pattern, get_pattern_slider_vars())
 
     # Variabili
     var_tile = ctk.BooleanVar()
@@ -159,6 +181,10 @@ def create_patterns_gui():
     pattern_slider_stripe = ctk.CTkSlider(frame_pattern_left, from_=0, to=100, command=preview_update_cmd)
     pattern_slider_stripe.pack(fill="x", pady=5, padx=20)
     
+    # Checkbox Cache risultati
+    var_cache = ctk.BooleanVar()
+    ctk.CTkCheckBox(frame_pattern_left, text="Cache risultati (strisce ripetibili)", variable=var_cache).pack(anchor="w", pady=(10, 0))
+    
     # Destra: Preview
     frame_pattern_right = ctk.CTkFrame(frame_pattern_main, width=300)
     frame_pattern_right.pack(side="right", fill="y", padx=(5, 0))
@@ -167,6 +193,14 @@ def create_patterns_gui():
     ctk.CTkLabel(frame_pattern_right, text="PREVIEW", font=("Arial", 14, "bold")).pack(pady=10)
     preview_label_pattern = ctk.CTkLabel(frame_pattern_right, text="Seleziona cartella frame sorgente")
     preview_label_pattern.pack(pady=10)
+    latency_label_pattern = ctk.CTkLabel(frame_pattern_right, text="")
+    latency_label_pattern.pack()
+    
+    # Worker della preview: i risultati tornano nel thread della GUI con root.after
+    preview_renderer = PreviewRenderer(
+        render_preview_pattern,
+        lambda result, latency_ms: show_preview_pattern(preview_label_pattern, latency_label_pattern, result, latency_ms),
+        lambda fn: root.after(0, fn))
     
     # Inizializza la preview per mostrare il messaggio iniziale
     update_preview_pattern(preview_label_pattern, get_pattern_slider_vars())
@@ -181,11 +215,11 @@ def create_patterns_gui():
     frame_pattern_buttons.pack(pady=10)
 
     btn_pattern_static = ctk.CTkButton(frame_pattern_buttons, text="✨ Genera Texture Statica (1 Img)",
-                                       command=lambda: run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_var_pattern, static=True))
+                                       command=lambda: run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_var_pattern, var_cache, static=True))
     btn_pattern_static.pack(side="left", padx=5)
 
     btn_pattern_sequence = ctk.CTkButton(frame_pattern_buttons, text="🎥 Genera Sequenza Pattern (Tutti)",
-                                         command=lambda: run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_var_pattern, static=False))
+                                         command=lambda: run_pattern_thread(root, btn_pattern_static, btn_pattern_sequence, progress_var_pattern, var_cache, static=False))
     btn_pattern_sequence.pack(side="left", padx=5)
 
     root.mainloop()
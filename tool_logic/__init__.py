@@ -0,0 +1,77 @@
+"""Motori condivisi dei tool MiniTools.
+
+Unico pacchetto importato da tutte le GUI (estrazione, effetti, pattern,
+creazione video, rinomina) e dalla CLI headless. Le funzioni elencate in
+__all__ sono l'API stabile; i moduli interni possono cambiare.
+
+OpenCV, NumPy e PIL vengono importati solo al primo utilizzo e
+customtkinter solo da create_preview, quindi il pacchetto si carica in
+fretta anche su server senza display.
+"""
+from .frames import (
+    FRAME_EXTENSIONS,
+    FRAME_FORMATS,
+    IMAGE_EXTENSIONS,
+    INTERPOLATIONS,
+    NORM_METHODS,
+    SEEK_MIN_INTERVAL,
+    FrameNormalizer,
+    extract_frames,
+    extract_frames_batch,
+    iter_video_frames,
+    normalize_frame,
+)
+from .video import (
+    collect_interleaved_frames,
+    create_video_from_files,
+    create_video_from_folder,
+    find_ffmpeg,
+    interleave_folders,
+)
+from .effects import (
+    apply_effect_chain,
+    apply_effect_chain_array,
+    apply_effects,
+    apply_effects_to_single_image_for_preview,
+    compile_effects,
+    process_effect,
+)
+from .patterns import MAX_FULL_TILE, apply_pattern_to_image, apply_patterns
+from .pipeline import run_pipeline
+from .rename import rename_and_convert_multiple
+from .preview import PREVIEW_SIZE, PreviewRenderer, create_preview, fit_preview, load_preview_proxy
+
+__all__ = [
+    "FRAME_EXTENSIONS",
+    "FRAME_FORMATS",
+    "IMAGE_EXTENSIONS",
+    "INTERPOLATIONS",
+    "NORM_METHODS",
+    "SEEK_MIN_INTERVAL",
+    "FrameNormalizer",
+    "extract_frames",
+    "extract_frames_batch",
+    "iter_video_frames",
+    "normalize_frame",
+    "collect_interleaved_frames",
+    "create_video_from_files",
+    "create_video_from_folder",
+    "find_ffmpeg",
+    "interleave_folders",
+    "apply_effect_chain",
+    "apply_effect_chain_array",
+    "apply_effects",
+    "apply_effects_to_single_image_for_preview",
+    "compile_effects",
+    "process_effect",
+    "MAX_FULL_TILE",
+    "apply_pattern_to_image",
+    "apply_patterns",
+    "run_pipeline",
+    "rename_and_convert_multiple",
+    "PREVIEW_SIZE",
+    "PreviewRenderer",
+    "create_preview",
+    "fit_preview",
+    "load_preview_proxy",
+]
@@ -0,0 +1,6 @@
+"""Permette python -m tool_logic job.json"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,22 @@
+"""Import differito delle librerie pesanti (OpenCV, NumPy, PIL)"""
+import importlib
+
+class _LazyModule:
+    """Segnaposto per un modulo pesante importato solo al primo utilizzo.
+
+    Al primo accesso a un attributo importa il modulo e sostituisce se
+    stesso nel namespace del modulo che lo ha dichiarato: da lì in poi le
+    funzioni usano il modulo reale, senza costi aggiuntivi. Così la CLI e i
+    processi worker caricano solo le librerie che usano davvero (ad esempio
+    un worker di effetti PIL non importa OpenCV).
+    """
+
+    def __init__(self, name, alias, namespace):
+        self._name = name
+        self._alias = alias
+        self._namespace = namespace
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        self._namespace[self._alias] = module
+        return getattr(module, attr)
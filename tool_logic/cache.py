@@ -0,0 +1,121 @@
+"""Cache su disco dei frame elaborati (effetti e pattern), indirizzata per contenuto"""
+import os
+import json
+import hashlib
+import threading
+
+from .video import _place_file
+
+# ========== CACHE DEI RISULTATI ==========
+
+# Cartella e dimensione massima di default (sovrascrivibile con MINITOOLS_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.environ.get("MINITOOLS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "minitools")
+DEFAULT_CACHE_SIZE = 2 * 1024 ** 3
+
+def _tmp_name(path):
+    """File temporaneo accanto a path, unico per processo e thread"""
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+class ResultCache:
+    """Cache dei frame elaborati, indicizzata dal contenuto del sorgente.
+
+    La chiave è l'hash dei byte del file sorgente più i parametri che
+    determinano l'output (effetti, slider, esito dell'estrazione casuale,
+    seed): rieseguire gli stessi effetti sugli stessi frame, anche copiati
+    altrove o riestratti, recupera il risultato invece di ricalcolarlo.
+    Le voci vengono copiate nell'output con un reflink quando il filesystem
+    lo permette. Oltre max_bytes trim() elimina le voci usate meno di
+    recente (la data di modifica viene aggiornata a ogni hit).
+
+    Contiene solo percorsi e limiti, quindi può essere passata ai processi
+    worker.
+    """
+
+    def __init__(self, folder=None, max_bytes=DEFAULT_CACHE_SIZE):
+        self.folder = folder or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def resolve(cls, cache):
+        """Converte il parametro cache delle funzioni batch in una ResultCache.
+
+        None/False: nessuna cache; True: cartella di default; stringa:
+        cartella della cache; dict: argomenti di ResultCache (job JSON/YAML).
+        """
+        if not cache:
+            return None
+        if isinstance(cache, cls):
+            return cache
+        if cache is True:
+            return cls()
+        if isinstance(cache, dict):
+            return cls(**cache)
+        return cls(cache)
+
+    def key(self, src, *parts):
+        """Chiave di cache per il file src e i parametri che ne determinano l'output"""
+        h = hashlib.blake2b(digest_size=20)
+        with open(src, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        h.update(json.dumps(parts, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def _entry(self, key, ext):
+        return os.path.join(self.folder, key[:2], key + ext)
+
+    def fetch(self, key, dst):
+        """Copia in dst il risultato in cache; False se non presente"""
+        entry = self._entry(key, os.path.splitext(dst)[1])
+        if not os.path.exists(entry):
+            return False
+        # Copia in un file temporaneo e poi rinomina: con overwrite dst è il
+        # sorgente stesso e non deve andare perso se la copia fallisce
+        tmp_path = _tmp_name(dst)
+        try:
+            _place_file(entry, tmp_path, "reflink")
+            os.replace(tmp_path, dst)
+            os.utime(entry)
+        except OSError:
+            # Voce rimossa da un trim concorrente: si ricalcola
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
+
+    def store(self, key, src):
+        """Salva in cache il file src appena prodotto (scrittura atomica)"""
+        entry = self._entry(key, os.path.splitext(src)[1])
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp_path = _tmp_name(entry)
+        try:
+            _place_file(src, tmp_path, "reflink")
+            os.replace(tmp_path, entry)
+        except OSError:
+            # Una cache piena o non scrivibile non deve far fallire il job
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def trim(self):
+        """Elimina le voci usate meno di recente finché la cache supera max_bytes"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.folder):
+            for f in files:
+                path = os.path.join(root, f)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,109 @@
+"""Esecuzione headless dei tool da file di job (nessun import di Tk)"""
+import json
+import sys
+import inspect
+import time
+
+from .frames import extract_frames, extract_frames_batch
+from .video import create_video_from_folder, create_video_from_files, interleave_folders
+from .effects import apply_effects
+from .patterns import apply_patterns
+from .rename import rename_and_convert_multiple
+from .pipeline import run_pipeline
+
+# ========== ESECUZIONE HEADLESS (CLI) ==========
+
+# Operazioni eseguibili da un file di job
+JOB_OPERATIONS = {
+    "extract_frames": extract_frames,
+    "extract_frames_batch": extract_frames_batch,
+    "create_video_from_folder": create_video_from_folder,
+    "create_video_from_files": create_video_from_files,
+    "interleave_folders": interleave_folders,
+    "apply_effects": apply_effects,
+    "apply_patterns": apply_patterns,
+    "rename_and_convert_multiple": rename_and_convert_multiple,
+    "run_pipeline": run_pipeline,
+}
+
+def load_job(path):
+    """Legge un file di job JSON o YAML ("-" = stdin); restituisce la lista dei passi
+
+    Formato: {"steps": [{"op": "apply_effects", "params": {...}}, ...]}
+    oppure un singolo passo {"op": ..., "params": {...}}.
+    """
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError("Per i job YAML serve PyYAML (pip install pyyaml)")
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    
+    steps = spec.get("steps", [spec]) if isinstance(spec, dict) else spec
+    for idx, step in enumerate(steps):
+        if step.get("op") not in JOB_OPERATIONS:
+            raise ValueError(f"Passo {idx}: operazione sconosciuta {step.get('op')!r}")
+    return steps
+
+def _emit(event, stream, **fields):
+    """Scrive un evento di progresso come riga JSON"""
+    stream.write(json.dumps({"event": event, **fields}, default=str) + "\n")
+    stream.flush()
+
+def run_job(steps, stream=None):
+    """Esegue in sequenza i passi di un job, emettendo eventi JSON (uno per riga)
+    su stream: start, progress, done oppure error. Restituisce True se tutti
+    i passi sono stati completati. Le operazioni che accettano stats
+    (tempi, hit/miss della cache) le riportano nell'evento done."""
+    stream = stream or sys.stdout
+    
+    for idx, step in enumerate(steps):
+        op = step["op"]
+        params = dict(step.get("params", {}))
+        last = [None]
+        
+        def progress(value, idx=idx, op=op, last=last):
+            # Un evento per ogni decimo di punto percentuale
+            value = round(value, 1)
+            if value != last[0]:
+                last[0] = value
+                _emit("progress", stream, step=idx, op=op, percent=value)
+        
+        params["progress_callback"] = progress
+        fn = JOB_OPERATIONS[op]
+        stats = None
+        if "stats" in inspect.signature(fn).parameters:
+            stats = params.setdefault("stats", {})
+        _emit("start", stream, step=idx, op=op)
+        start = time.perf_counter()
+        try:
+            result = fn(**params)
+        except Exception as e:
+            _emit("error", stream, step=idx, op=op, error=f"{type(e).__name__}: {e}")
+            return False
+        extra = {"stats": stats} if stats else {}
+        _emit("done", stream, step=idx, op=op, result=result, seconds=round(time.perf_counter() - start, 3), **extra)
+    
+    return True
+
+def main(argv=None):
+    """Entry point da riga di comando: minitools job.json (o python -m tool_logic job.json)"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="minitools", description="Esegue un job di MiniTools senza interfaccia grafica")
+    parser.add_argument("job", help="file di job JSON o YAML (- per stdin)")
+    args = parser.parse_args(argv)
+    
+    try:
+        steps = load_job(args.job)
+    except Exception as e:
+        _emit("error", sys.stdout, error=f"{type(e).__name__}: {e}")
+        return 2
+    return 0 if run_job(steps) else 1
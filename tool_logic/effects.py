@@ -0,0 +1,328 @@
+"""Effetti sui frame: motore PIL e motore NumPy/OpenCV con LUT fuse"""
+import os
+import random
+from functools import lru_cache
+
+from ._lazy import _LazyModule
+from .parallel import _create_executor, _run_bounded, _item_rng
+from .manifest import JobManifest, manifest_path
+from .cache import ResultCache
+from .frames import IMAGE_EXTENSIONS
+
+cv2 = _LazyModule("cv2", "cv2", globals())
+np = _LazyModule("numpy", "np", globals())
+Image = _LazyModule("PIL.Image", "Image", globals())
+ImageOps = _LazyModule("PIL.ImageOps", "ImageOps", globals())
+ImageFilter = _LazyModule("PIL.ImageFilter", "ImageFilter", globals())
+ImageEnhance = _LazyModule("PIL.ImageEnhance", "ImageEnhance", globals())
+
+# ========== FUNZIONI EFFETTI ==========
+
+def _process_effect_chunk(tasks, effects, sliders, probability, engine="pil", seed=None, cache=None):
+    """Processa un blocco di frame in un'unica chiamata (riduce l'IPC tra processi);
+    restituisce (task completati, hit della cache)"""
+    hits = 0
+    for input_path, output_path in tasks:
+        rng = _item_rng(seed, os.path.basename(input_path))
+        hits += process_effect(input_path, output_path, effects, sliders, probability, engine, rng, cache)
+    return tasks, hits
+
+def apply_effects(folder, effects, sliders, probability=0.5, overwrite=False, progress_callback=None, backend="auto", workers=None, chunksize=None, max_in_flight=None, engine="pil", resume=True, seed=None, cache=None, stats=None):
+    """Applica uno o più effetti con parametri regolabili (parallelo)
+
+    backend: "threads", "processes" o "auto"; workers di default è il numero
+    di CPU. chunksize è il numero di frame per task (default: 1 con i thread,
+    abbastanza grande da ammortizzare l'IPC con i processi).
+    max_in_flight: task sottomessi contemporaneamente (default 4 per worker).
+    engine: "pil" oppure "numpy" (vedi process_effect)
+    resume: salta i frame già elaborati da un'esecuzione interrotta con gli
+    stessi parametri (vedi JobManifest); con overwrite evita di applicare
+    l'effetto due volte allo stesso file. False riparte da zero. Dopo
+    un'esecuzione completata si riparte da zero con overwrite (nuova
+    passata in place) o con una scelta casuale senza seed.
+    seed: rende ripetibile la scelta casuale dei frame (per nome del file)
+    cache: ResultCache, cartella, True (cartella di default) oppure None;
+    i frame già calcolati con gli stessi effetti vengono copiati dalla cache.
+    Se stats è un dict, vi vengono scritti frame elaborati, saltati (ripresa),
+    hit e miss della cache
+    """
+    files = sorted([f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS)])
+    if not files:
+        return 0
+
+    if overwrite:
+        out_folder = folder
+    else:
+        out_folder = os.path.join(folder, "effects_out")
+        os.makedirs(out_folder, exist_ok=True)
+
+    manifest = JobManifest(manifest_path(out_folder, "apply_effects"), "apply_effects", {
+        "folder": os.path.abspath(folder), "effects": effects, "sliders": sliders,
+        "probability": probability, "overwrite": overwrite, "engine": engine, "seed": seed,
+    }, resume)
+    # Un job concluso si salta solo se rieseguirlo darebbe lo stesso risultato
+    if manifest.finished and (overwrite or (seed is None and probability < 1)):
+        manifest.reset()
+    cache = ResultCache.resolve(cache)
+    
+    total = len(files)
+    hits = 0
+    workers = max(1, workers or os.cpu_count() or 1)
+    
+    # Il journal è aperto: va chiuso anche se la creazione dell'executor fallisce
+    with manifest:
+        tasks = []
+        for f in files:
+            input_path, output_path = os.path.join(folder, f), os.path.join(out_folder, f)
+            if not manifest.is_done(f, src=input_path, out=output_path):
+                tasks.append((input_path, output_path))
+        completed = skipped = total - len(tasks)
+        
+        executor, backend = _create_executor(backend, workers, len(tasks))
+        if chunksize is None:
+            chunksize = 1 if backend == "threads" else max(1, min(32, len(tasks) // (workers * 4)))
+        if max_in_flight is None:
+            max_in_flight = workers * 4
+        
+        def chunks():
+            for start in range(0, len(tasks), chunksize):
+                yield tasks[start:start + chunksize], effects, sliders, probability, engine, seed, cache
+        
+        def on_result(result):
+            nonlocal completed, hits
+            done, chunk_hits = result
+            hits += chunk_hits
+            for input_path, output_path in done:
+                manifest.mark_done(os.path.basename(output_path), src=input_path, out=output_path)
+            completed += len(done)
+            if progress_callback:
+                progress_callback((completed / total) * 100)
+        
+        with executor:
+            _run_bounded(executor, _process_effect_chunk, chunks(), max(1, max_in_flight), on_result)
+        manifest.finish(True)
+    if cache:
+        cache.trim()
+    
+    if stats is not None:
+        processed = total - skipped
+        stats.update(processed=processed, skipped=skipped,
+                     cache_hits=hits if cache else 0, cache_misses=processed - hits if cache else 0)
+    return out_folder
+
+def process_effect(input_path, output_path, effects, sliders, probability, engine="pil", rng=None, cache=None):
+    """Processa un singolo frame con gli effetti
+
+    engine: "pil" (mantiene il modo dell'immagine) oppure "numpy" (OpenCV,
+    il frame viene letto e salvato come BGR a 8 bit)
+    rng: generatore per la scelta casuale (default: modulo random)
+    cache: ResultCache opzionale. La chiave contiene l'esito della scelta
+    casuale, quindi il risultato è riusabile anche senza seed.
+    Restituisce True se il frame è stato preso dalla cache.
+    """
+    apply = (rng or random).random() < probability
+    
+    if cache is not None:
+        key = cache.key(input_path, "effects", effects, sliders, engine, apply)
+        if cache.fetch(key, output_path):
+            return True
+    
+    if engine == "numpy":
+        frame = cv2.imread(input_path, cv2.IMREAD_COLOR)
+        if apply:
+            frame = apply_effect_chain_array(frame, effects, sliders)
+        cv2.imwrite(output_path, frame)
+    else:
+        img = Image.open(input_path)
+        if apply:
+            img = apply_effect_chain(img, effects, sliders)
+        img.save(output_path)
+    
+    if cache is not None:
+        cache.store(key, output_path)
+    return False
+
+# ========== COMPILAZIONE DEGLI EFFETTI IN LUT ==========
+
+@lru_cache(maxsize=None)
+def _ramp():
+    """Tabella identità 0..255 (creata al primo uso per non importare NumPy al caricamento)"""
+    return np.arange(256, dtype=np.uint8)
+
+def _blend_lut(table, degenerate, factor):
+    """Tabella equivalente a Image.blend(costante degenerate, img, factor),
+    con la stessa aritmetica float32 e troncamento di Pillow"""
+    factor = np.float32(factor)
+    degenerate = np.float32(degenerate)
+    out = degenerate + factor * (table.astype(np.float32) - degenerate)
+    if factor < 0 or factor > 1:
+        out = np.clip(out, 0, 255)
+    return out.astype(np.uint8)
+
+def compile_effects(effects, sliders):
+    """Traduce gli effetti selezionati in un piano di passi.
+
+    Le operazioni tonali per pixel (posterize, soglia B/N, luminosità)
+    diventano tabelle da 256 valori che l'esecutore compone in un'unica
+    LUT; il contrasto dipende dalla media dell'immagine e viene risolto in
+    LUT al momento dell'esecuzione. Solo blur e la conversione in scala di
+    grigi interrompono la catena. Passi:
+    ("lut", tabella), ("contrast", fattore), ("gray", None), ("blur", raggio), ("rgb", None)
+    """
+    plan = []
+    gray = False
+
+    if "posterize" in effects:
+        bits = int(2 + sliders.get("posterize", 0) / 20)
+        plan.append(("lut", _ramp() & np.uint8(256 - 2 ** (8 - bits))))
+
+    if "bw" in effects:
+        threshold = int(sliders.get("bw", 0) * 2.55)
+        # La soglia lavora sul canale L: si resta in scala di grigi fino alla fine
+        # (blur, contrasto e luminosità danno lo stesso risultato su L o su RGB grigio)
+        plan.append(("gray", None))
+        plan.append(("lut", np.where(_ramp() > threshold, 255, 0).astype(np.uint8)))
+        gray = True
+
+    if "blur" in effects:
+        plan.append(("blur", sliders.get("blur", 0) / 10))
+
+    if "contrast" in effects:
+        plan.append(("contrast", 0.5 + (sliders.get("contrast", 50) / 50)))
+
+    if "brightness" in effects:
+        factor = 0.5 + (sliders.get("brightness", 50) / 50)
+        plan.append(("lut", _blend_lut(_ramp(), 0, factor)))
+
+    if gray:
+        plan.append(("rgb", None))
+    return plan
+
+def _gray_mean(hist, bands, lut):
+    """Media del canale L (come ImageEnhance.Contrast) dopo la LUT pendente,
+    calcolata dall'istogramma senza applicare la LUT all'immagine"""
+    values = _ramp() if lut is None else lut
+    means = []
+    for band in range(bands):
+        counts = np.asarray(hist[band * 256:(band + 1) * 256], dtype=np.float64)
+        means.append(float(np.dot(counts, values)) / max(1.0, counts.sum()))
+    if bands == 1:
+        mean = means[0]
+    else:
+        mean = (means[0] * 299 + means[1] * 587 + means[2] * 114) / 1000
+    return int(mean + 0.5)
+
+def _apply_lut_pil(img, lut):
+    if lut is None:
+        return img
+    return img.point(lut.tolist() * len(img.getbands()))
+
+def _run_effect_plan_pil(img, plan):
+    """Esegue un piano di compile_effects su un'immagine PIL (modo L o RGB)"""
+    lut = None
+    for op, arg in plan:
+        if op == "lut":
+            lut = arg if lut is None else arg[lut]
+        elif op == "contrast":
+            mean = _gray_mean(img.histogram(), len(img.getbands()), lut)
+            table = _blend_lut(_ramp(), mean, arg)
+            lut = table if lut is None else table[lut]
+        else:
+            img = _apply_lut_pil(img, lut)
+            lut = None
+            if op == "gray":
+                img = img.convert("L")
+            elif op == "rgb":
+                img = img.convert("RGB")
+            elif op == "blur":
+                img = img.filter(ImageFilter.GaussianBlur(arg))
+    return _apply_lut_pil(img, lut)
+
+def _array_histogram(arr):
+    """Istogramma in ordine di bande RGB (come Image.histogram) di un array BGR o grigio"""
+    if arr.ndim == 2:
+        return cv2.calcHist([arr], [0], None, [256], [0, 256]).ravel()
+    return np.concatenate([cv2.calcHist([arr], [c], None, [256], [0, 256]).ravel() for c in (2, 1, 0)])
+
+def _run_effect_plan_array(arr, plan):
+    """Esegue un piano di compile_effects su un array uint8 BGR (o grigio)
+    con OpenCV: stesse LUT del percorso PIL, blur con cv2.GaussianBlur"""
+    lut = None
+    for op, arg in plan:
+        if op == "lut":
+            lut = arg if lut is None else arg[lut]
+        elif op == "contrast":
+            bands = 1 if arr.ndim == 2 else 3
+            mean = _gray_mean(_array_histogram(arr), bands, lut)
+            table = _blend_lut(_ramp(), mean, arg)
+            lut = table if lut is None else table[lut]
+        else:
+            if lut is not None:
+                arr = cv2.LUT(arr, lut)
+                lut = None
+            if op == "gray" and arr.ndim == 3:
+                arr = cv2.cvtColor(arr, cv2.COLOR_BGR2GRAY)
+            elif op == "rgb" and arr.ndim == 2:
+                arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2BGR)
+            elif op == "blur" and arg > 0:
+                # Il raggio di ImageFilter.GaussianBlur corrisponde alla deviazione standard
+                arr = cv2.GaussianBlur(arr, (0, 0), sigmaX=arg)
+    if lut is not None:
+        arr = cv2.LUT(arr, lut)
+    return arr
+
+def apply_effect_chain_array(frame, effects, sliders):
+    """Applica gli effetti a un frame OpenCV (array uint8 BGR o grigio)
+    senza passare da PIL: utilizzabile subito dopo la decodifica di un video.
+    Restituisce un nuovo array; il frame in ingresso non viene modificato."""
+    plan = compile_effects(effects, sliders)
+    if not plan:
+        return frame.copy()
+    out = _run_effect_plan_array(frame, plan)
+    return out.copy() if out is frame else out
+
+def _apply_effects_stepwise(img, effects, sliders):
+    """Catena originale, un passaggio completo per effetto (modi diversi da L/RGB)"""
+    if "posterize" in effects:
+        bits = int(2 + sliders.get("posterize", 0) / 20)
+        img = ImageOps.posterize(img, bits)
+    
+    if "bw" in effects:
+        threshold = int(sliders.get("bw", 0) * 2.55)
+        img = img.convert("L").point(lambda p: 255 if p > threshold else 0).convert("RGB")
+    
+    if "blur" in effects:
+        radius = sliders.get("blur", 0) / 10
+        img = img.filter(ImageFilter.GaussianBlur(radius))
+    
+    if "contrast" in effects:
+        factor = 0.5 + (sliders.get("contrast", 50) / 50)
+        img = ImageEnhance.Contrast(img).enhance(factor)
+    
+    if "brightness" in effects:
+        factor = 0.5 + (sliders.get("brightness", 50) / 50)
+        img = ImageEnhance.Brightness(img).enhance(factor)
+    
+    return img
+
+def apply_effect_chain(img, effects, sliders):
+    """Applica gli effetti a un'immagine PIL fondendo le operazioni tonali
+    in una sola passata LUT; restituisce sempre una nuova immagine"""
+    if img.mode not in ("L", "RGB"):
+        return _apply_effects_stepwise(img, effects, sliders)
+    plan = compile_effects(effects, sliders)
+    if not plan:
+        return img.copy()
+    return _run_effect_plan_pil(img, plan)
+
+def apply_effects_to_single_image_for_preview(img, effects, slider_values, scale=1.0):
+    """Applica effetti a una singola immagine per preview in modo sincrono
+
+    scale: rapporto tra la preview e il frame originale (vedi
+    load_preview_proxy). Il raggio del blur è in pixel, quindi viene ridotto
+    nella stessa proporzione per mostrare sul proxy lo stesso risultato
+    visivo del frame a piena risoluzione.
+    """
+    if scale != 1.0 and "blur" in effects:
+        slider_values = dict(slider_values, blur=slider_values.get("blur", 0) * scale)
+    return apply_effect_chain(img, effects, slider_values)
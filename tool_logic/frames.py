@@ -0,0 +1,513 @@
+"""Estrazione e normalizzazione dei frame video (OpenCV)"""
+import os
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from ._lazy import _LazyModule
+from .manifest import JobManifest, manifest_path, file_signature
+
+cv2 = _LazyModule("cv2", "cv2", globals())
+np = _LazyModule("numpy", "np", globals())
+
+# ========== FUNZIONI BASE CON OPENCV (OTTIMIZZATE) ==========
+
+# Interpolazioni disponibili per la normalizzazione. "auto" usa INTER_AREA
+# in riduzione (più veloce e senza aliasing) e INTER_LANCZOS4 in ingrandimento.
+INTERPOLATIONS = {
+    "lanczos": "INTER_LANCZOS4",
+    "area": "INTER_AREA",
+    "cubic": "INTER_CUBIC",
+    "linear": "INTER_LINEAR",
+    "nearest": "INTER_NEAREST",
+}
+
+# Metodi di normalizzazione: con un altro metodo il frame resta invariato
+NORM_METHODS = ("resize", "crop", "pad")
+
+class FrameNormalizer:
+    """Piano di normalizzazione precalcolato per una geometria fissa.
+
+    Finestra di crop, dimensione di resize, bordi di pad e interpolazione
+    vengono calcolati una sola volta per (dimensione sorgente, dimensione
+    target, metodo): tutti i frame di uno stesso video li riusano.
+    """
+
+    def __init__(self, source_size, target_size, method="resize", interpolation="lanczos"):
+        w, h = source_size
+        target_w, target_h = target_size
+        self.source_size = (w, h)
+        self.target_size = (target_w, target_h)
+        self.method = method
+        self._crop = None
+        self._resize_to = None
+        self._borders = None
+
+        if method == "resize":
+            self._resize_to = (target_w, target_h)
+            scaled_from = (w, h)
+        elif method == "crop":
+            aspect = w / h
+            target_aspect = target_w / target_h
+
+            if aspect > target_aspect:
+                new_w = int(h * target_aspect)
+                x = (w - new_w) // 2
+                self._crop = (slice(None), slice(x, x + new_w))
+                scaled_from = (new_w, h)
+            else:
+                new_h = int(w / target_aspect)
+                y = (h - new_h) // 2
+                self._crop = (slice(y, y + new_h), slice(None))
+                scaled_from = (w, new_h)
+            self._resize_to = (target_w, target_h)
+        elif method == "pad":
+            aspect = w / h
+            target_aspect = target_w / target_h
+
+            if aspect > target_aspect:
+                new_w = target_w
+                new_h = int(target_w / aspect)
+            else:
+                new_h = target_h
+                new_w = int(target_h * aspect)
+
+            top = (target_h - new_h) // 2
+            left = (target_w - new_w) // 2
+            self._resize_to = (new_w, new_h)
+            self._borders = (top, target_h - new_h - top, left, target_w - new_w - left)
+            scaled_from = (w, h)
+        else:
+            # Metodo sconosciuto: il frame viene restituito invariato
+            scaled_from = (w, h)
+
+        if interpolation == "auto":
+            downscale = (self._resize_to is not None
+                         and self._resize_to[0] <= scaled_from[0]
+                         and self._resize_to[1] <= scaled_from[1])
+            interpolation = "area" if downscale else "lanczos"
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Interpolazione non supportata: {interpolation}")
+        self.interpolation = getattr(cv2, INTERPOLATIONS[interpolation])
+
+    def new_buffer(self, img):
+        """Alloca un canvas nero di dimensione target compatibile con img,
+        da riusare come destinazione con out= (i bordi di pad restano neri)"""
+        target_w, target_h = self.target_size
+        return np.zeros((target_h, target_w) + img.shape[2:], dtype=img.dtype)
+
+    def __call__(self, img, out=None):
+        """Normalizza img; se out è fornito (da new_buffer) scrive lì senza allocare.
+
+        Con un metodo non in NORM_METHODS restituisce img invariato e out
+        non viene usato.
+        """
+        if self._resize_to is None:
+            return img
+        if self._crop is not None:
+            img = img[self._crop]
+        if out is None:
+            if self._borders is None:
+                return cv2.resize(img, self._resize_to, interpolation=self.interpolation)
+            out = self.new_buffer(img)
+        if self._borders is not None:
+            # Resize direttamente nella ROI centrata del canvas nero
+            top, _, left, _ = self._borders
+            new_w, new_h = self._resize_to
+            cv2.resize(img, self._resize_to, dst=out[top:top + new_h, left:left + new_w],
+                       interpolation=self.interpolation)
+        else:
+            cv2.resize(img, self._resize_to, dst=out, interpolation=self.interpolation)
+        return out
+
+def normalize_frame(img, method="resize", target_size=(1920, 1080), interpolation="lanczos"):
+    """Normalizza un frame secondo il metodo scelto
+
+    Per sequenze di frame con la stessa geometria conviene creare un
+    FrameNormalizer una volta sola e riusarlo.
+    """
+    h, w = img.shape[:2]
+    return FrameNormalizer((w, h), target_size, method, interpolation)(img)
+
+# Oltre questo intervallo (in frame) conviene saltare con un seek invece di
+# decodificare tutti i frame intermedi: un seek riparte dal keyframe precedente,
+# quindi è vantaggioso solo quando l'intervallo supera una tipica GOP.
+SEEK_MIN_INTERVAL = 120
+
+def _choose_extract_mode(mode, frame_interval, total_frames):
+    """Sceglie la strategia di lettura più economica per l'intervallo richiesto"""
+    if mode != "auto":
+        return mode
+    if frame_interval <= 1:
+        return "read"
+    if frame_interval >= SEEK_MIN_INTERVAL and total_frames > 0:
+        return "seek"
+    return "grab"
+
+def _iter_sampled_frames(cap, frame_interval, total_frames, mode, reuse=False, start=0):
+    """Restituisce (indice_frame, frame) solo per i frame da salvare.
+
+    - read: decodifica e converte ogni frame (comportamento originale)
+    - grab: per i frame scartati usa cap.grab(), senza retrieve/conversione
+    - seek: salta direttamente al frame successivo con CAP_PROP_POS_FRAMES
+
+    Con reuse=True la decodifica riusa sempre lo stesso array: il chiamante
+    deve consumare il frame prima di chiedere il successivo.
+    start: numero di frame campionati iniziali da saltare senza restituirli
+    (ripresa di un'estrazione interrotta): vengono solo letti con grab()
+    oppure superati con un seek.
+    """
+    buf = None
+
+    def read():
+        nonlocal buf
+        ret, frame = cap.read(buf)
+        if ret and reuse:
+            buf = frame
+        return ret, frame
+
+    if mode == "seek":
+        for frame_count in range(start * frame_interval, total_frames, frame_interval):
+            if frame_count > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count)
+            ret, frame = read()
+            if not ret:
+                break
+            yield frame_count, frame
+        return
+
+    frame_count = 0
+    while True:
+        if frame_count < start * frame_interval:
+            if not cap.grab():
+                break
+        elif frame_count % frame_interval == 0:
+            ret, frame = read()
+            if not ret:
+                break
+            yield frame_count, frame
+        elif mode == "grab":
+            if not cap.grab():
+                break
+        else:
+            ret, _ = read()
+            if not ret:
+                break
+        frame_count += 1
+
+# Formati di output dei frame estratti: estensione, flag qualità di cv2.imwrite
+# e intervallo ammesso. "npy" salva l'array grezzo, "bmp" non comprime.
+FRAME_FORMATS = {
+    "png": (".png", "IMWRITE_PNG_COMPRESSION", (0, 9)),
+    "jpg": (".jpg", "IMWRITE_JPEG_QUALITY", (0, 100)),
+    "webp": (".webp", "IMWRITE_WEBP_QUALITY", (1, 100)),
+    "bmp": (".bmp", None, None),
+    "npy": (".npy", None, None),
+}
+
+# Estensioni dei frame leggibili come immagini da effetti, pattern e GUI;
+# la creazione video legge anche gli array .npy scritti da extract_frames
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+FRAME_EXTENSIONS = IMAGE_EXTENSIONS + (".npy",)
+
+def _frame_write_params(image_format, quality=None):
+    """Restituisce (estensione, parametri imwrite) per il formato richiesto"""
+    if image_format not in FRAME_FORMATS:
+        raise ValueError(f"Formato frame non supportato: {image_format}")
+    ext, flag, limits = FRAME_FORMATS[image_format]
+    if quality is None or flag is None:
+        return ext, []
+    low, high = limits
+    return ext, [getattr(cv2, flag), min(high, max(low, int(quality)))]
+
+def _write_frame(path, frame, params):
+    """Salva un frame su disco (array .npy oppure immagine via cv2.imwrite)"""
+    if path.endswith(".npy"):
+        np.save(path, frame)
+    else:
+        cv2.imwrite(path, frame, params)
+
+class _FrameWriter:
+    """Scrittura write-behind dei frame: un pool di thread codifica e salva
+    mentre il thread chiamante continua a decodificare.
+
+    La coda è limitata (queue_depth), quindi se i worker restano indietro
+    submit() si blocca e la memoria occupata dai frame in attesa resta fissa.
+    Con workers=0 la scrittura avviene in modo sincrono.
+    on_written(path) viene chiamata dopo ogni scrittura riuscita.
+    """
+
+    def __init__(self, workers=2, queue_depth=16, params=None, on_written=None):
+        self._errors = []
+        self._params = params or []
+        self._on_written = on_written
+        self._queue = queue.Queue(maxsize=max(1, queue_depth))
+        self._threads = [threading.Thread(target=self._worker, daemon=True)
+                         for _ in range(max(0, workers))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, path, frame, release=None):
+        """Accoda il frame; release(frame) viene chiamata a scrittura conclusa"""
+        if self._errors:
+            raise self._errors[0]
+        if not self._threads:
+            self._write(path, frame, release)
+            return
+        self._queue.put((path, frame, release))
+
+    def _write(self, path, frame, release):
+        try:
+            _write_frame(path, frame, self._params)
+            if self._on_written:
+                self._on_written(path)
+        finally:
+            if release:
+                release(frame)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(*item)
+            except Exception as e:
+                self._errors.append(e)
+
+    def close(self):
+        """Attende lo svuotamento della coda e chiude i worker"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        if self._errors:
+            raise self._errors[0]
+
+class _BufferPool:
+    """Pool di buffer riusabili, creati su richiesta fino a un massimo.
+
+    Quando tutti i buffer sono in uso acquire() attende un release():
+    è il numero di frame in volo (coda + worker) a fissarne la quantità.
+    """
+
+    def __init__(self, factory, limit):
+        self._factory = factory
+        self._limit = max(1, limit)
+        self._created = 0
+        self._free = queue.Queue()
+
+    def acquire(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        if self._created < self._limit:
+            self._created += 1
+            return self._factory()
+        return self._free.get()
+
+    def release(self, buf):
+        self._free.put(buf)
+
+def extract_frames(video_path, output_folder, fps=1, normalize=False, norm_method="resize", resolution="1920x1080", progress_callback=None, mode="auto", writer_workers=2, queue_depth=16, image_format="png", quality=None, interpolation="lanczos", resume=True):
+    """Estrae i frame da un video usando OpenCV con opzione di normalizzazione
+
+    mode: "read", "grab", "seek" oppure "auto" (sceglie in base all'intervallo)
+    writer_workers / queue_depth: thread di scrittura e frame massimi in coda
+    image_format / quality: uno tra FRAME_FORMATS; quality è la compressione
+    PNG (0-9) o la qualità JPEG/WebP, None usa il default di OpenCV
+    interpolation: una tra INTERPOLATIONS oppure "auto"
+    resume: riprende un'estrazione interrotta nella stessa cartella con gli
+    stessi parametri (vedi JobManifest), saltando i frame già scritti;
+    False riparte da zero
+    """
+    ext, params = _frame_write_params(image_format, quality)
+    os.makedirs(output_folder, exist_ok=True)
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return 0
+    
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_interval = max(1, int(video_fps / fps))
+    mode = _choose_extract_mode(mode, frame_interval, total_frames)
+    
+    w, h = map(int, resolution.split('x'))
+    target_size = (w, h)
+    
+    manifest = JobManifest(manifest_path(output_folder, "extract_frames"), "extract_frames", {
+        "video": [os.path.abspath(video_path), file_signature(video_path)],
+        "fps": fps, "normalize": normalize, "norm_method": norm_method, "resolution": resolution,
+        "mode": mode, "image_format": image_format, "quality": quality, "interpolation": interpolation,
+    }, resume)
+    
+    def frame_name(idx):
+        return f"frame_{idx:06d}{ext}"
+    
+    # Frame iniziali già scritti da un'esecuzione precedente: non vengono decodificati
+    saved_count = 0
+    while manifest.is_done(frame_name(saved_count), out=os.path.join(output_folder, frame_name(saved_count))):
+        saved_count += 1
+    if manifest.finished and saved_count >= manifest.result:
+        cap.release()
+        manifest.close()
+        return manifest.result
+    
+    # Solo i metodi noti scrivono nel buffer di destinazione: con un metodo
+    # sconosciuto il frame decodificato passa invariato al writer, quindi
+    # non si può riusare l'array di decodifica né il pool di buffer
+    reshape = normalize and norm_method in NORM_METHODS
+    normalizer = None
+    pool = None
+    release = None
+    writer = _FrameWriter(writer_workers, queue_depth, params,
+                          on_written=lambda path: manifest.mark_done(os.path.basename(path), out=path))
+    # Frame che possono essere in volo contemporaneamente: coda + worker + quello in preparazione
+    max_in_flight = queue_depth + writer_workers + 1
+    
+    try:
+        try:
+            # Con la normalizzazione il frame decodificato viene consumato subito,
+            # quindi la decodifica può riusare sempre lo stesso array
+            frames = _iter_sampled_frames(cap, frame_interval, total_frames, mode, reuse=reshape,
+                                          start=saved_count)
+            for frame_count, frame in frames:
+                output_path = os.path.join(output_folder, frame_name(saved_count))
+                if manifest.is_done(frame_name(saved_count), out=output_path):
+                    saved_count += 1
+                    continue
+                
+                if reshape:
+                    frame_size = (frame.shape[1], frame.shape[0])
+                    if normalizer is None or normalizer.source_size != frame_size:
+                        normalizer = FrameNormalizer(frame_size, target_size, norm_method, interpolation)
+                        pool = _BufferPool(lambda src=frame: normalizer.new_buffer(src), max_in_flight)
+                        release = pool.release
+                    frame = normalizer(frame, out=pool.acquire())
+                
+                # Il nome è assegnato in ordine di decodifica: resta deterministico
+                # anche se i worker completano le scritture in ordine diverso
+                writer.submit(output_path, frame, release)
+                saved_count += 1
+                
+                if progress_callback and total_frames > 0:
+                    progress_callback((frame_count / total_frames) * 100)
+        finally:
+            cap.release()
+            writer.close()
+        manifest.finish(saved_count)
+    finally:
+        manifest.close()
+    
+    return saved_count
+
+def _extract_job_init(threads_per_job):
+    """Limita i thread interni di OpenCV nel processo worker"""
+    cv2.setNumThreads(threads_per_job)
+
+def _extract_job(job_idx, video_path, output_folder, kwargs, progress_queue):
+    """Esegue extract_frames in un processo worker inoltrando il progresso"""
+    last = [-1]
+
+    def report(value):
+        # Inoltra solo i cambi di punto percentuale per limitare l'IPC
+        step = int(value)
+        if step != last[0]:
+            last[0] = step
+            progress_queue.put((job_idx, value))
+
+    return extract_frames(video_path, output_folder, progress_callback=report, **kwargs)
+
+def extract_frames_batch(videos, output_folder, threads_per_job=2, max_jobs=None, progress_callback=None, **kwargs):
+    """Estrae i frame da più video in parallelo, un processo per video
+
+    Ogni video finisce in una sottocartella di output_folder con il suo nome;
+    ai nomi ripetuti viene aggiunto un suffisso (clip, clip_2, ...).
+    threads_per_job è il budget di core per video (thread OpenCV e worker di
+    scrittura); max_jobs di default è cpu_count // threads_per_job.
+    Con resume (default, tra i kwargs di extract_frames) i video già estratti
+    vengono saltati e quelli interrotti ripresi dall'ultimo frame scritto.
+    Restituisce una lista di dict {"video", "output", "saved", "error"}.
+    """
+    if not videos:
+        return []
+
+    threads_per_job = max(1, threads_per_job)
+    if max_jobs is None:
+        max_jobs = max(1, (os.cpu_count() or 1) // threads_per_job)
+    max_jobs = max(1, min(max_jobs, len(videos)))
+    kwargs.setdefault("writer_workers", threads_per_job)
+
+    results = []
+    used_names = set()
+    for v in videos:
+        # Video con lo stesso nome (a/clip.mp4, b/clip.mp4) girano in parallelo:
+        # ognuno ha una sottocartella (e un manifest) distinta
+        base_name = video_name = os.path.splitext(os.path.basename(v))[0]
+        suffix = 2
+        while video_name.lower() in used_names:
+            video_name = f"{base_name}_{suffix}"
+            suffix += 1
+        used_names.add(video_name.lower())
+        results.append({"video": v, "output": os.path.join(output_folder, video_name),
+                        "saved": 0, "error": None})
+
+    total = len(videos)
+    progress = [0.0] * total
+
+    with multiprocessing.Manager() as manager:
+        progress_queue = manager.Queue()
+        with ProcessPoolExecutor(max_workers=max_jobs, initializer=_extract_job_init,
+                                 initargs=(threads_per_job,)) as executor:
+            futures = {}
+            for idx, r in enumerate(results):
+                future = executor.submit(_extract_job, idx, r["video"], r["output"], kwargs, progress_queue)
+                futures[future] = idx
+
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+
+                while True:
+                    try:
+                        idx, value = progress_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    progress[idx] = max(progress[idx], value)
+
+                for future in done:
+                    idx = futures[future]
+                    try:
+                        results[idx]["saved"] = future.result()
+                        if results[idx]["saved"] == 0:
+                            results[idx]["error"] = "Nessun frame estratto (video non leggibile?)"
+                    except Exception as e:
+                        results[idx]["error"] = str(e)
+                    progress[idx] = 100
+
+                if progress_callback:
+                    progress_callback(sum(progress) / total)
+
+    return results
+
+def iter_video_frames(video_path, fps=1, mode="auto"):
+    """Genera (progresso %, frame BGR) per i frame campionati di un video,
+    senza scriverli su disco; stessa selezione dei frame di extract_frames"""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return
+    
+    try:
+        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_interval = max(1, int(video_fps / fps))
+        mode = _choose_extract_mode(mode, frame_interval, total_frames)
+        
+        for frame_count, frame in _iter_sampled_frames(cap, frame_interval, total_frames, mode):
+            progress = (frame_count / total_frames) * 100 if total_frames > 0 else 0
+            yield progress, frame
+    finally:
+        cap.release()
@@ -0,0 +1,213 @@
+"""Manifest dei job batch: ripresa di elaborazioni interrotte"""
+import os
+import json
+import time
+import hashlib
+import threading
+
+# ========== MANIFEST DEI JOB (RIPRESA) ==========
+
+MANIFEST_VERSION = 1
+
+# Segnaposto del risultato di un job non ancora concluso
+_UNFINISHED = object()
+
+def manifest_path(folder, operation):
+    """Percorso del manifest di un'operazione in una cartella di output.
+
+    Il nome dipende dall'operazione: estrazione ed effetti in place possono
+    condividere la stessa cartella senza sovrascriversi i manifest.
+    """
+    return os.path.join(folder, f".minitools_{operation}.jsonl")
+
+def file_manifest_path(output_path):
+    """Manifest di un'operazione che produce un singolo file (video)"""
+    folder, name = os.path.split(os.path.abspath(output_path))
+    return os.path.join(folder, f".{name}.minitools.jsonl")
+
+def file_signature(path):
+    """Firma (dimensione, mtime in ns) di un file, None se non esiste"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def files_digest(paths):
+    """Impronta di un elenco ordinato di file (percorsi e firme)"""
+    h = hashlib.sha1()
+    for path in paths:
+        h.update(json.dumps([os.path.abspath(path), file_signature(path)]).encode())
+    return h.hexdigest()
+
+def _params_digest(operation, params):
+    text = json.dumps([operation, params], sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+class JobManifest:
+    """Registro degli elementi completati di un job batch, scritto accanto
+    all'output per poter riprendere un'elaborazione interrotta.
+
+    Il file è un journal JSON-lines: un'intestazione (operazione e impronta
+    dei parametri) seguita da una riga per elemento completato con la firma
+    (dimensione, mtime) del sorgente e dell'output. Le righe vengono
+    accodate a blocchi, quindi il costo resta proporzionale al lavoro nuovo
+    anche con centinaia di migliaia di frame; una riga troncata da
+    un'interruzione viene ignorata in lettura.
+
+    Un elemento risulta già fatto solo se sorgente e output esistono ancora
+    con la firma registrata: file modificati, cancellati o scritti a metà
+    vengono rielaborati. Se cambiano i parametri il manifest riparte da zero,
+    così come con resume=False.
+
+    È thread-safe: mark_done può essere chiamato dai worker di scrittura.
+    """
+
+    def __init__(self, path, operation, params, resume=True, flush_every=256, flush_interval=1.0):
+        self.path = path
+        self.operation = operation
+        self.digest = _params_digest(operation, params)
+        self.plan = None
+        self._items = {}
+        self._result = _UNFINISHED
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_every = max(1, flush_every)
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._file = None
+
+        if not (resume and self._load()):
+            self.reset()
+        else:
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        """Legge un manifest esistente; False se manca o non è compatibile"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except OSError:
+            return False
+
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return False
+        if (header.get("version") != MANIFEST_VERSION or header.get("operation") != self.operation
+                or header.get("params") != self.digest):
+            return False
+
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Riga vuota o troncata da un'interruzione
+                continue
+            if "k" in record:
+                self._items[record["k"]] = (record.get("s"), record.get("o"))
+            elif "plan" in record:
+                self.plan = record["plan"]
+            elif "result" in record:
+                self._result = record["result"]
+        return True
+
+    def reset(self):
+        """Scarta gli elementi registrati e riscrive l'intestazione (in modo atomico)"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._items.clear()
+            self._pending.clear()
+            self._result = _UNFINISHED
+            self.plan = None
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            header = {"version": MANIFEST_VERSION, "operation": self.operation, "params": self.digest}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(header) + "\n")
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def set_plan(self, plan):
+        """Registra un piano da riusare alla ripresa (ad esempio l'ordine
+        casuale dei frame interfoliati), scartando gli elementi precedenti"""
+        self.reset()
+        self.plan = plan
+        self._append({"plan": plan}, force=True)
+
+    @property
+    def done_count(self):
+        """Numero di elementi registrati come completati"""
+        return len(self._items)
+
+    def is_done(self, key, src=None, out=None):
+        """True se key è completato e sorgente/output hanno ancora la firma registrata"""
+        entry = self._items.get(key)
+        if entry is None:
+            return False
+        src_sig, out_sig = entry
+        if src is not None and file_signature(src) != src_sig:
+            return False
+        if out is not None and file_signature(out) != out_sig:
+            return False
+        return True
+
+    def mark_done(self, key, src=None, out=None):
+        """Registra key come completato con le firme attuali di sorgente e output.
+
+        Nelle elaborazioni in place (src == out) la firma del sorgente è
+        quella del file già riscritto: alla ripresa il file risulta fatto
+        invece di ricevere l'effetto una seconda volta.
+        """
+        src_sig = file_signature(src) if src is not None else None
+        out_sig = file_signature(out) if out is not None else None
+        with self._lock:
+            self._items[key] = (src_sig, out_sig)
+        self._append({"k": key, "s": src_sig, "o": out_sig})
+
+    @property
+    def finished(self):
+        """True se il job è stato concluso in un'esecuzione precedente"""
+        return self._result is not _UNFINISHED
+
+    @property
+    def result(self):
+        """Risultato registrato da finish()"""
+        return None if self._result is _UNFINISHED else self._result
+
+    def finish(self, result=True):
+        """Segna il job come concluso: una nuova esecuzione restituisce subito result"""
+        self._result = result
+        self._append({"result": result}, force=True)
+
+    def _append(self, record, force=False):
+        with self._lock:
+            self._pending.append(json.dumps(record, default=str))
+            now = time.monotonic()
+            if (force or len(self._pending) >= self._flush_every
+                    or now - self._last_flush >= self._flush_interval):
+                self._flush_locked(now)
+
+    def _flush_locked(self, now=None):
+        if self._pending and self._file:
+            self._file.write("\n".join(self._pending) + "\n")
+            self._file.flush()
+            self._pending.clear()
+        self._last_flush = now if now is not None else time.monotonic()
+
+    def close(self):
+        """Scrive le righe in sospeso e chiude il journal"""
+        with self._lock:
+            self._flush_locked()
+            if self._file:
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,48 @@
+"""Esecuzione parallela condivisa dai tool (thread o processi, finestra limitata)"""
+import random
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+def _seed_worker():
+    """Rende indipendente il generatore casuale di ogni processo worker
+    (con fork tutti i figli erediterebbero lo stesso stato)"""
+    random.seed()
+
+def _item_rng(seed, name):
+    """Generatore casuale di un singolo elemento: con seed l'esito dipende solo
+    da (seed, nome), non dal worker o dall'ordine di esecuzione. Con seed None
+    si usa il generatore globale."""
+    if seed is None:
+        return random
+    return random.Random(f"{seed}:{name}")
+
+def _create_executor(backend, workers, task_count):
+    """Crea l'executor per il backend richiesto; restituisce (executor, backend usato)
+
+    backend: "threads", "processes" oppure "auto" (processi se ci sono più
+    worker e abbastanza lavoro da ammortizzarne l'avvio).
+    """
+    if backend == "auto":
+        backend = "processes" if workers > 1 and task_count >= 2 * workers else "threads"
+    if backend == "processes":
+        return ProcessPoolExecutor(max_workers=workers, initializer=_seed_worker), backend
+    if backend == "threads":
+        return ThreadPoolExecutor(max_workers=workers), backend
+    raise ValueError(f"Backend di esecuzione non supportato: {backend}")
+
+def _run_bounded(executor, fn, args_iter, max_in_flight, on_result):
+    """Sottomette fn(*args) per ogni args mantenendo al massimo max_in_flight
+    task in volo: i nuovi task partono man mano che i precedenti completano,
+    quindi futures e argomenti in memoria restano limitati anche con
+    centinaia di migliaia di file. on_result riceve ogni risultato."""
+    in_flight = set()
+    for args in args_iter:
+        if len(in_flight) >= max_in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                on_result(future.result())
+        in_flight.add(executor.submit(fn, *args))
+
+    while in_flight:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            on_result(future.result())
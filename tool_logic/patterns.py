@@ -0,0 +1,256 @@
+"""Pattern e texture (tile, mirror, stripe)"""
+import os
+import random
+
+from ._lazy import _LazyModule
+from .manifest import JobManifest, manifest_path
+from .parallel import _item_rng, _create_executor, _run_bounded
+from .cache import ResultCache
+from .frames import IMAGE_EXTENSIONS
+
+np = _LazyModule("numpy", "np", globals())
+Image = _LazyModule("PIL.Image", "Image", globals())
+ImageOps = _LazyModule("PIL.ImageOps", "ImageOps", globals())
+
+# ========== FUNZIONI PATTERN & TEXTURE (OTTIMIZZATE) ==========
+
+# Ripetizioni massime del tile quando la texture viene materializzata a
+# dimensione piena (w·times × h·times): oltre, la memoria per frame esplode
+MAX_FULL_TILE = 5
+
+def _tile_array(arr, reps_y, reps_x):
+    """Equivalente di np.tile per un array H×W×C: un'unica copia in broadcast
+    in un array preallocato, senza array intermedi"""
+    h, w, c = arr.shape
+    out = np.empty((reps_y, h, reps_x, w, c), dtype=arr.dtype)
+    out[:] = arr[None, :, None]
+    return out.reshape(reps_y * h, reps_x * w, c)
+
+def _tile_image(img, times, output_size=None):
+    """Ripete l'immagine times × times con una copia vettoriale.
+
+    Senza output_size il risultato è grande (w·times, h·times), come con la
+    griglia di paste originale. Con output_size l'immagine viene prima
+    ridotta alla dimensione di una singola piastrella e poi ripetuta,
+    quindi la texture nasce già alla risoluzione finale e la memoria non
+    dipende da times.
+    """
+    img = img.convert("RGB")
+    if output_size is None:
+        return Image.fromarray(_tile_array(np.asarray(img), times, times))
+    
+    out_w, out_h = output_size
+    # Piastrelle arrotondate per eccesso: l'ultima riga/colonna viene ritagliata
+    tile_w = max(1, -(-out_w // times))
+    tile_h = max(1, -(-out_h // times))
+    if (tile_w, tile_h) != img.size:
+        img = img.resize((tile_w, tile_h), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    tiled = _tile_array(np.asarray(img), -(-out_h // tile_h), -(-out_w // tile_w))
+    return Image.fromarray(np.ascontiguousarray(tiled[:out_h, :out_w]))
+
+# Fino a questo numero di strisce crop/paste di PIL (memcpy nativi) costa
+# meno della conversione in array; oltre, la gather ha costo costante
+STRIPE_PASTE_MAX = 128
+
+def _stripe_edges(width, slices):
+    """Bordi delle strisce distribuiti su tutta la larghezza (differiscono al
+    più di una colonna): ogni colonna appartiene esattamente a una striscia
+    anche se width non è multiplo di slices"""
+    return np.arange(slices + 1) * width // slices
+
+def _stripe_columns(width, order):
+    """Indici di colonna sorgente per ogni colonna di output, con le strisce
+    nell'ordine order (permutazione di range(slices))"""
+    order = np.asarray(order)
+    edges = _stripe_edges(width, len(order))
+    widths = np.diff(edges)[order]
+    # Per ogni colonna di output: striscia di appartenenza e posizione al suo interno
+    stripe = np.repeat(np.arange(len(order)), widths)
+    out_starts = np.cumsum(widths) - widths
+    return edges[order][stripe] + (np.arange(width) - out_starts[stripe])
+
+def _shuffle_stripes_array(arr, order):
+    """Rimescola le strisce verticali di un array H×W(×C) con un'unica gather
+    sulle colonne: una sola allocazione, costo indipendente dal numero di strisce"""
+    return np.take(arr, _stripe_columns(arr.shape[1], order), axis=1)
+
+def _shuffle_stripes(img, slices, rng=None):
+    """Rimescola slices strisce verticali coprendo tutte le colonne"""
+    w, h = img.size
+    slices = max(1, min(slices, w))
+    order = list(range(slices))
+    (rng or random).shuffle(order)
+    
+    if slices > STRIPE_PASTE_MAX:
+        return Image.fromarray(_shuffle_stripes_array(np.asarray(img.convert("RGB")), order))
+    
+    edges = _stripe_edges(w, slices).tolist()
+    new_img = Image.new("RGB", (w, h))
+    x = 0
+    for o in order:
+        new_img.paste(img.crop((edges[o], 0, edges[o + 1], h)), (x, 0))
+        x += edges[o + 1] - edges[o]
+    return new_img
+
+def apply_pattern_to_image(img, patterns, sliders, rng=None, output_size=None, max_tile=None):
+    """Applica i pattern a una singola immagine in modo ottimizzato
+
+    rng: generatore per il rimescolamento delle strisce (default: modulo random)
+    output_size: (larghezza, altezza) a cui generare direttamente il tile,
+    senza materializzare la texture a dimensione piena; in questo caso le
+    ripetizioni non sono limitate a MAX_FULL_TILE
+    max_tile: limite delle ripetizioni del tile (default: MAX_FULL_TILE senza
+    output_size, nessuno con output_size); una preview generata con
+    output_size passa MAX_FULL_TILE per mostrare la stessa griglia del file
+    salvato senza output_size
+    """
+    if "tile" in patterns:
+        times = max(1, int(1 + sliders["tile"] / 20))
+        if max_tile is None and output_size is None:
+            max_tile = MAX_FULL_TILE
+        if max_tile is not None:
+            times = min(times, max_tile)
+        img = _tile_image(img, times, output_size)
+    
+    if "mirror" in patterns:
+        img = ImageOps.mirror(img)
+    
+    if "stripe" in patterns:
+        slices = int(2 + sliders["stripe"] / 20)
+        img = _shuffle_stripes(img, slices, rng)
+    
+    return img
+
+def _render_pattern(src, dst, patterns, sliders, rng, cache, seed, output_size=None):
+    """Applica i pattern a un file e salva il risultato; True se preso dalla cache
+
+    Le strisce sono casuali: senza seed il risultato non è ripetibile e
+    non viene messo in cache.
+    """
+    if "stripe" in patterns:
+        if seed is None:
+            cache = None
+        # Con il seed il rimescolamento dipende anche dal nome del file
+        variant = [seed, os.path.basename(src)]
+    else:
+        variant = None
+    
+    if cache is not None:
+        key = cache.key(src, "patterns", patterns, sliders, variant, output_size)
+        if cache.fetch(key, dst):
+            return True
+    
+    img = Image.open(src)
+    img = apply_pattern_to_image(img, patterns, sliders, rng, output_size)
+    img.save(dst)
+    
+    if cache is not None:
+        cache.store(key, dst)
+    return False
+
+def _process_pattern_chunk(tasks, patterns, sliders, frame_seed, cache, seed, output_size):
+    """Processa un blocco di frame in un'unica chiamata (riduce l'IPC tra processi);
+    restituisce (task completati, hit della cache)"""
+    hits = 0
+    for src, dst in tasks:
+        rng = _item_rng(frame_seed, os.path.basename(src))
+        hits += _render_pattern(src, dst, patterns, sliders, rng, cache, seed, output_size)
+    return tasks, hits
+
+def apply_patterns(folder, patterns, sliders, sequence=False, progress_callback=None, resume=True, seed=None, cache=None, stats=None, output_size=None, backend="auto", workers=None, chunksize=None, max_in_flight=None):
+    """Applica pattern statici o a sequenza
+
+    In modalità sequenza i frame vengono elaborati in parallelo come in
+    apply_effects (backend, workers, chunksize, max_in_flight); i nomi
+    pattern_%06d seguono l'ordine dei file, non quello di completamento.
+    Il rimescolamento delle strisce di ogni frame dipende solo dal seed e
+    dal nome del file, quindi non cambia con il numero di worker.
+
+    resume: in modalità sequenza salta i frame già elaborati da
+    un'esecuzione interrotta con gli stessi parametri (vedi JobManifest).
+    Dopo un'esecuzione completata con strisce senza seed si riparte da
+    zero, con un nuovo rimescolamento.
+    seed: rende ripetibile il rimescolamento delle strisce tra un'esecuzione
+    e l'altra; senza seed ne viene estratto uno per esecuzione
+    cache: ResultCache, cartella, True (cartella di default) oppure None
+    (vedi apply_effects). Se stats è un dict, vi vengono scritti frame
+    elaborati, saltati (ripresa), hit e miss della cache.
+    output_size: (larghezza, altezza) o "LxA" del tile generato
+    direttamente alla risoluzione finale (vedi apply_pattern_to_image)
+    """
+    if isinstance(output_size, str):
+        output_size = tuple(map(int, output_size.split('x')))
+    files = sorted([f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS)])
+    if not files:
+        return None
+
+    out_folder = os.path.join(folder, "textures_out")
+    os.makedirs(out_folder, exist_ok=True)
+    cache = ResultCache.resolve(cache)
+    processed = skipped = hits = 0
+
+    if sequence:
+        total = len(files)
+        manifest = JobManifest(manifest_path(out_folder, "apply_patterns"), "apply_patterns", {
+            "folder": os.path.abspath(folder), "files": files, "patterns": patterns, "sliders": sliders,
+            "seed": seed, "output_size": output_size,
+        }, resume)
+        if manifest.finished and "stripe" in patterns and seed is None:
+            manifest.reset()
+        
+        # Il journal è aperto: va chiuso anche se la creazione dell'executor fallisce
+        with manifest:
+            # Nomi assegnati qui in ordine di file: restano deterministici
+            # qualunque sia l'ordine in cui i worker completano
+            tasks = []
+            for idx, f in enumerate(files):
+                src = os.path.join(folder, f)
+                dst = os.path.join(out_folder, f"pattern_{idx:06d}.png")
+                if not manifest.is_done(os.path.basename(dst), src=src, out=dst):
+                    tasks.append((src, dst))
+            completed = skipped = total - len(tasks)
+            if progress_callback and completed:
+                progress_callback((completed / total) * 100)
+            
+            # Seed dei frame: quello richiesto oppure uno nuovo per questa esecuzione
+            frame_seed = seed if seed is not None else random.getrandbits(64)
+            workers = max(1, workers or os.cpu_count() or 1)
+            executor, backend = _create_executor(backend, workers, len(tasks))
+            if chunksize is None:
+                chunksize = 1 if backend == "threads" else max(1, min(32, len(tasks) // (workers * 4)))
+            if max_in_flight is None:
+                max_in_flight = workers * 4
+            
+            def chunks():
+                for start in range(0, len(tasks), chunksize):
+                    yield tasks[start:start + chunksize], patterns, sliders, frame_seed, cache, seed, output_size
+            
+            def on_result(result):
+                nonlocal completed, processed, hits
+                done, chunk_hits = result
+                hits += chunk_hits
+                for src, dst in done:
+                    manifest.mark_done(os.path.basename(dst), src=src, out=dst)
+                processed += len(done)
+                completed += len(done)
+                if progress_callback:
+                    progress_callback((completed / total) * 100)
+            
+            with executor:
+                _run_bounded(executor, _process_pattern_chunk, chunks(), max(1, max_in_flight), on_result)
+            manifest.finish(True)
+        result = out_folder
+    else:
+        # Statico: usa solo la prima immagine e salva
+        src = os.path.join(folder, files[0])
+        result = os.path.join(out_folder, "pattern_static.png")
+        hits += _render_pattern(src, result, patterns, sliders, _item_rng(seed, files[0]), cache, seed, output_size)
+        processed += 1
+    
+    if cache:
+        cache.trim()
+    if stats is not None:
+        cacheable = cache is not None and ("stripe" not in patterns or seed is not None)
+        stats.update(processed=processed, skipped=skipped,
+                     cache_hits=hits, cache_misses=processed - hits if cacheable else 0)
+    return result
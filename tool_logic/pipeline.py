@@ -0,0 +1,112 @@
+"""Pipeline in memoria: estrazione → effetti → pattern → video"""
+import os
+import random
+
+from ._lazy import _LazyModule
+from .frames import FrameNormalizer, iter_video_frames
+from .video import _open_video_writer
+from .effects import apply_effect_chain_array
+from .patterns import apply_pattern_to_image
+from .manifest import JobManifest, file_manifest_path, file_signature
+
+cv2 = _LazyModule("cv2", "cv2", globals())
+np = _LazyModule("numpy", "np", globals())
+Image = _LazyModule("PIL.Image", "Image", globals())
+
+# ========== PIPELINE IN MEMORIA (ESTRAZIONE → EFFETTI → PATTERN → VIDEO) ==========
+
+def _apply_patterns_to_array(frame, patterns, sliders, output_size=None):
+    """Applica i pattern a un frame OpenCV. I pattern sono solo geometrici,
+    quindi l'ordine dei canali (BGR) non conta e non serve convertire"""
+    img = apply_pattern_to_image(Image.fromarray(frame), patterns, sliders, output_size=output_size)
+    return np.asarray(img)
+
+def run_pipeline(video_path, output_path, fps=1, normalize=False, norm_method="resize", resolution="1920x1080", effects=None, sliders=None, probability=1.0, patterns=None, pattern_sliders=None, video_fps=25, codec="mp4v", backend="opencv", encoder="libx264", preset="medium", crf=23, mode="auto", interpolation="lanczos", progress_callback=None, resume=True):
+    """Estrae i frame da un video, applica effetti e pattern e scrive il video
+    finale in un'unica passata in memoria.
+
+    Equivale a extract_frames → apply_effects → apply_patterns(sequence=True)
+    → create_video_from_folder, ma senza sequenze PNG intermedie: solo il
+    video di output tocca il disco. Restituisce il numero di frame scritti.
+    resume: se il video di output è già stato completato dallo stesso
+    sorgente con gli stessi parametri, non viene rielaborato. Con
+    resume=False il video viene sempre rielaborato e non viene scritto
+    alcun manifest. Se la codifica fallisce (ad esempio ffmpeg termina
+    con errore) restituisce 0.
+    """
+    if not resume:
+        return _run_pipeline(video_path, output_path, fps, normalize, norm_method, resolution, effects,
+                             sliders, probability, patterns, pattern_sliders, video_fps, codec, backend,
+                             encoder, preset, crf, mode, interpolation, progress_callback)
+    
+    params = dict(locals())
+    params.pop("progress_callback")
+    params.pop("resume")
+    params["video_path"] = [os.path.abspath(video_path), file_signature(video_path)]
+    with JobManifest(file_manifest_path(output_path), "run_pipeline", params, resume) as manifest:
+        if manifest.finished and manifest.is_done("video", out=output_path):
+            return manifest.result
+        written = _run_pipeline(video_path, output_path, fps, normalize, norm_method, resolution, effects,
+                                sliders, probability, patterns, pattern_sliders, video_fps, codec, backend,
+                                encoder, preset, crf, mode, interpolation, progress_callback)
+        if written:
+            manifest.mark_done("video", out=output_path)
+            manifest.finish(written)
+    return written
+
+def _run_pipeline(video_path, output_path, fps, normalize, norm_method, resolution, effects, sliders, probability, patterns, pattern_sliders, video_fps, codec, backend, encoder, preset, crf, mode, interpolation, progress_callback):
+    """Corpo di run_pipeline: una passata dal video sorgente al video finale"""
+    w, h = map(int, resolution.split('x'))
+    target_size = (w, h)
+    effects = effects or []
+    patterns = patterns or []
+    
+    out, _ = _open_video_writer(output_path, video_fps, target_size, codec, backend, encoder, preset, crf)
+    if not out.isOpened():
+        out.release()
+        return 0
+    
+    # Piani di normalizzazione (iniziale) e di resize finale, per dimensione sorgente
+    normalizers = {}
+    resizers = {}
+    written = 0
+    
+    def plan_for(cache, frame, method):
+        frame_size = (frame.shape[1], frame.shape[0])
+        plan = cache.get(frame_size)
+        if plan is None:
+            plan = cache[frame_size] = FrameNormalizer(frame_size, target_size, method, interpolation)
+        return plan
+    
+    try:
+        for progress, frame in iter_video_frames(video_path, fps, mode):
+            if normalize:
+                frame = plan_for(normalizers, frame, norm_method)(frame)
+            
+            if effects and random.random() < probability:
+                frame = apply_effect_chain_array(frame, effects, sliders or {})
+            
+            if patterns:
+                # Il tile nasce già alla risoluzione del video: nessuna texture a dimensione piena
+                frame = _apply_patterns_to_array(frame, patterns, pattern_sliders or {}, target_size)
+            
+            if frame.ndim == 2:
+                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+            if (frame.shape[1], frame.shape[0]) != target_size:
+                frame = plan_for(resizers, frame, "resize")(frame)
+            
+            try:
+                out.write(frame)
+            except RuntimeError:
+                # ffmpeg è terminato: il video non è utilizzabile
+                written = 0
+                break
+            written += 1
+            
+            if progress_callback:
+                progress_callback(progress)
+    finally:
+        # Con ffmpeg release() è False se la codifica è fallita
+        ok = out.release() is not False
+    
+    return written if ok else 0
@@ -0,0 +1,119 @@
+"""Utilità grafiche per le GUI (customtkinter viene importato solo qui, al bisogno)"""
+import time
+import threading
+
+from ._lazy import _LazyModule
+
+Image = _LazyModule("PIL.Image", "Image", globals())
+
+# ========== FUNZIONI DI UTILITÀ GRAFICA (USATE DALLE GUI) ==========
+
+# Lato massimo (px) delle preview mostrate dalle GUI
+PREVIEW_SIZE = 250
+
+def load_preview_proxy(path, max_size=PREVIEW_SIZE):
+    """Decodifica un'immagine una sola volta alla risoluzione della preview.
+
+    Per i JPEG Image.draft fa ridurre la decodifica al decoder stesso
+    (scala DCT 1/2, 1/4, 1/8), senza mai allocare il frame intero; gli altri
+    formati vengono decodificati una volta e ridotti. Restituisce
+    (proxy RGB, scala) dove scala è il rapporto tra larghezza del proxy e
+    dell'originale, da passare agli effetti che dipendono dai pixel (blur).
+    """
+    img = Image.open(path)
+    full_width = img.size[0]
+    img.draft("RGB", (max_size, max_size))
+    img = img.convert("RGB")
+    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    return img, img.size[0] / full_width
+
+def fit_preview(img, max_size=PREVIEW_SIZE):
+    """Copia dell'immagine ridotta entro max_size (nessun import di Tk)"""
+    preview = img.copy()
+    preview.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    return preview
+
+def create_preview(img, max_size=PREVIEW_SIZE):
+    """Crea una preview ridimensionata dell'immagine usando CTkImage"""
+    # Import locale: la CLI e i processi worker non devono caricare Tk
+    from customtkinter import CTkImage
+    
+    preview = fit_preview(img, max_size)
+    return CTkImage(light_image=preview, dark_image=preview, size=preview.size)
+
+class PreviewRenderer:
+    """Render della preview in un thread dedicato, fuori dal thread di Tk.
+
+    request(*args) registra l'ultima richiesta e ritorna subito: durante il
+    trascinamento di uno slider le richieste arrivate mentre un render è in
+    corso si fondono e viene calcolata solo l'ultima (vince il valore più
+    recente). Ogni richiesta incrementa un contatore di generazione: un
+    risultato superato da una richiesta più nuova viene scartato, sia nel
+    worker sia al momento della consegna.
+
+    render(*args) gira nel worker e restituisce il risultato (ad esempio
+    un'immagine PIL già ridotta); schedule(fn) deve eseguire fn sul thread
+    della GUI (con Tk: lambda fn: root.after(0, fn)). on_result(risultato,
+    latenza_ms) viene chiamata lì, con la latenza tra la richiesta e la
+    consegna; se render solleva un'eccezione il risultato è l'eccezione.
+    """
+
+    def __init__(self, render, on_result, schedule):
+        self._render = render
+        self._on_result = on_result
+        self._schedule = schedule
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending = None
+        self._closed = False
+        self.requests = 0
+        self.renders = 0
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def request(self, *args):
+        """Chiede un nuovo render con args, sostituendo quello in attesa"""
+        with self._cond:
+            self._generation += 1
+            self.requests += 1
+            self._pending = (self._generation, args, time.perf_counter())
+            self._cond.notify()
+
+    def cancel(self):
+        """Scarta la richiesta in attesa e il render in corso"""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                generation, args, requested = self._pending
+                self._pending = None
+
+            try:
+                result = self._render(*args)
+            except Exception as e:
+                result = e
+            self.renders += 1
+
+            if generation == self._generation:
+                self._schedule(lambda: self._deliver(generation, result, requested))
+
+    def _deliver(self, generation, result, requested):
+        # Sul thread della GUI: una richiesta arrivata dopo la fine del render
+        # rende il risultato già vecchio
+        if generation != self._generation:
+            return
+        self._on_result(result, (time.perf_counter() - requested) * 1000)
+
+    def close(self):
+        """Ferma il worker (le richieste in attesa vengono scartate)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
@@ -0,0 +1,60 @@
+"""Rinomina e conversione di sequenze di immagini"""
+import os
+from pathlib import Path
+
+from ._lazy import _LazyModule
+from .manifest import JobManifest, manifest_path
+
+Image = _LazyModule("PIL.Image", "Image", globals())
+
+# ========== FUNZIONI RINOMINA E CONVERSIONE ==========
+
+def rename_and_convert_multiple(folders, output_folder, base_name, output_format, progress_callback=None, resume=True):
+    """Rinomina e converte i file da più cartelle in un'unica cartella di output
+
+    resume: salta i file già convertiti da un'esecuzione interrotta con gli
+    stessi parametri (vedi JobManifest)
+    """
+    valid_formats = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp'}
+    
+    all_files = []
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for f in files:
+                if Path(f).suffix.lower() in valid_formats:
+                    all_files.append(os.path.join(root, f))
+    
+    if not all_files:
+        return 0
+    
+    all_files.sort()
+    total = len(all_files)
+    
+    os.makedirs(output_folder, exist_ok=True)
+    manifest = JobManifest(manifest_path(output_folder, "rename_and_convert"), "rename_and_convert", {
+        "files": [os.path.abspath(f) for f in all_files], "base_name": base_name, "output_format": output_format,
+    }, resume)
+    
+    with manifest:
+        for idx, src in enumerate(all_files):
+            try:
+                new_name = f"{base_name}_{idx+1:06d}.{output_format}"
+                dst = os.path.join(output_folder, new_name)
+                
+                if not manifest.is_done(new_name, src=src, out=dst):
+                    img = Image.open(src)
+                    
+                    if output_format.lower() in ['jpg', 'jpeg']:
+                        img = img.convert('RGB')
+                    elif output_format.lower() == 'png' and img.mode != 'RGBA':
+                        img = img.convert('RGBA')
+
+                    img.save(dst)
+                    manifest.mark_done(new_name, src=src, out=dst)
+                
+                if progress_callback:
+                    progress_callback((idx + 1) / total * 100)
+            except Exception as e:
+                print(f"Errore nel processare {src}: {e}")
+    
+    return total
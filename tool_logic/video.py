@@ -0,0 +1,343 @@
+"""Creazione video da sequenze di frame e interfoliazione di cartelle"""
+import os
+import errno
+import shutil
+import random
+import time
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ._lazy import _LazyModule
+from .frames import FrameNormalizer, FRAME_EXTENSIONS
+from .manifest import JobManifest, manifest_path, file_manifest_path, files_digest
+
+cv2 = _LazyModule("cv2", "cv2", globals())
+np = _LazyModule("numpy", "np", globals())
+
+# ========== CREAZIONE VIDEO E INTERFOLIAZIONE ==========
+
+def _load_video_frame(img_path, size, normalizers, interpolation):
+    """Decodifica (e ridimensiona se serve) un frame; restituisce (frame, secondi)
+
+    I file .npy sono array BGR salvati da extract_frames(image_format="npy").
+    """
+    start = time.perf_counter()
+    if img_path.lower().endswith(".npy"):
+        try:
+            frame = np.load(img_path)
+        except (OSError, ValueError):
+            frame = None
+    else:
+        frame = cv2.imread(img_path)
+    
+    if frame is not None and (frame.shape[1], frame.shape[0]) != size:
+        frame_size = (frame.shape[1], frame.shape[0])
+        normalizer = normalizers.get(frame_size)
+        if normalizer is None:
+            normalizer = normalizers[frame_size] = FrameNormalizer(frame_size, size, "resize", interpolation)
+        frame = normalizer(frame)
+    
+    return frame, time.perf_counter() - start
+
+# Eseguibile ffmpeg per il backend a pipe (sovrascrivibile con la variabile d'ambiente)
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+
+def find_ffmpeg():
+    """Restituisce il percorso di ffmpeg oppure None se non è installato"""
+    return shutil.which(FFMPEG_BINARY)
+
+class _FFmpegWriter:
+    """Writer video che invia frame BGR grezzi a un processo ffmpeg via pipe.
+
+    Espone la stessa interfaccia di cv2.VideoWriter usata in questo modulo
+    (isOpened, write, release), così i due backend sono intercambiabili.
+    Se ffmpeg fallisce, dopo release() il suo messaggio d'errore è in error.
+    """
+
+    def __init__(self, ffmpeg, output_path, fps, size, encoder="libx264", preset="medium", crf=23, threads=0):
+        w, h = size
+        cmd = [ffmpeg, "-y", "-loglevel", "error",
+               "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}", "-r", str(fps), "-i", "-",
+               "-an", "-c:v", encoder, "-preset", preset, "-crf", str(crf),
+               "-threads", str(threads), "-pix_fmt", "yuv420p"]
+        if encoder == "libx265":
+            # Tag richiesto dai player Apple per HEVC in MP4/MOV
+            cmd += ["-tag:v", "hvc1"]
+        cmd.append(output_path)
+        # stderr su file: una pipe non letta potrebbe bloccare ffmpeg
+        self._log = tempfile.TemporaryFile()
+        self.error = None
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self._log)
+
+    def isOpened(self):
+        return self._proc.poll() is None
+
+    def write(self, frame):
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame).data)
+        except (BrokenPipeError, OSError):
+            self._proc.wait()
+            raise RuntimeError(f"ffmpeg terminato con errore: {self._error_text()}")
+
+    def release(self):
+        """Chiude la pipe e attende ffmpeg; restituisce True se è terminato correttamente"""
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        ok = self._proc.wait() == 0
+        if not ok:
+            self.error = self._error_text() or f"ffmpeg terminato con codice {self._proc.returncode}"
+        self._log.close()
+        return ok
+
+    def _error_text(self):
+        self._log.seek(0)
+        return self._log.read().decode(errors="replace").strip()
+
+def _open_video_writer(output_path, fps, size, codec="mp4v", backend="opencv", encoder="libx264", preset="medium", crf=23):
+    """Apre il writer video del backend richiesto; restituisce (writer, backend usato)
+
+    backend: "opencv" (cv2.VideoWriter con fourcc codec), "ffmpeg" (pipe verso
+    ffmpeg con encoder/preset/crf) oppure "auto". Se ffmpeg non è disponibile
+    si ripiega su cv2.VideoWriter.
+    """
+    if backend in ("ffmpeg", "auto"):
+        ffmpeg = find_ffmpeg()
+        if ffmpeg:
+            return _FFmpegWriter(ffmpeg, output_path, fps, size, encoder, preset, crf), "ffmpeg"
+
+    fourcc = cv2.VideoWriter_fourcc(*codec)
+    return cv2.VideoWriter(output_path, fourcc, fps, size), "opencv"
+
+def create_video_from_files(files, output_path, fps=25, resolution="1920x1080", codec="mp4v", progress_callback=None, interpolation="lanczos", prefetch=16, decode_workers=4, stats=None, backend="opencv", encoder="libx264", preset="medium", crf=23, resume=True):
+    """Crea un video da una lista ordinata di immagini, decodificandole in streaming
+
+    I frame passano direttamente da cv2.imread a cv2.VideoWriter, senza
+    cartelle temporanee intermedie. Un pool di decode_workers thread decodifica
+    in anticipo fino a prefetch frame mentre il writer codifica, preservando
+    l'ordine. Se stats è un dict, vi vengono scritti frame scritti, tempo
+    di decodifica (somma sui worker), di codifica e di attesa del writer,
+    più l'eventuale errore del writer (error).
+    backend / encoder / preset / crf: vedi _open_video_writer
+    resume: se lo stesso video è già stato completato con gli stessi frame
+    (firme invariate) e parametri, non viene ricodificato (stats riporta
+    resumed=True e nessun frame). Un video interrotto a metà non è
+    riprendibile e viene ricreato da capo. Con resume=False il video viene
+    sempre codificato e accanto all'output non viene scritto alcun manifest.
+    """
+    w, h = map(int, resolution.split('x'))
+    
+    if not files:
+        return False
+    if stats is not None:
+        stats["resumed"] = False
+    if not resume:
+        return _encode_video(files, output_path, fps, (w, h), codec, progress_callback, interpolation,
+                             prefetch, decode_workers, stats, backend, encoder, preset, crf)
+    
+    manifest = JobManifest(file_manifest_path(output_path), "create_video", {
+        "files": files_digest(files), "fps": fps, "resolution": resolution, "codec": codec,
+        "interpolation": interpolation, "backend": backend, "encoder": encoder, "preset": preset, "crf": crf,
+    }, resume)
+    with manifest:
+        if manifest.finished and manifest.is_done("video", out=output_path):
+            if stats is not None:
+                stats.update(frames=0, decode_s=0.0, encode_s=0.0, wait_s=0.0, backend=None,
+                             error=None, resumed=True)
+            return manifest.result
+        ok = _encode_video(files, output_path, fps, (w, h), codec, progress_callback, interpolation,
+                           prefetch, decode_workers, stats, backend, encoder, preset, crf)
+        if ok:
+            manifest.mark_done("video", out=output_path)
+            manifest.finish(ok)
+    return ok
+
+def _encode_video(files, output_path, fps, size, codec, progress_callback, interpolation, prefetch, decode_workers, stats, backend, encoder, preset, crf):
+    """Corpo di create_video_from_files: decodifica in streaming e codifica"""
+    w, h = size
+    out, used_backend = _open_video_writer(output_path, fps, (w, h), codec, backend, encoder, preset, crf)
+    
+    if not out.isOpened():
+        out.release()
+        if stats is not None:
+            stats.update(frames=0, backend=used_backend, error=getattr(out, "error", None))
+        return False
+    
+    total = len(files)
+    # Un piano di resize per ogni dimensione sorgente incontrata
+    normalizers = {}
+    written = 0
+    decode_time = encode_time = wait_time = 0.0
+    error = None
+    
+    with ThreadPoolExecutor(max_workers=max(1, decode_workers)) as executor:
+        # Buffer di riordino: i futures restano in ordine di file
+        pending = deque()
+        next_files = enumerate(files)
+        
+        def fill():
+            while len(pending) < max(1, prefetch):
+                item = next(next_files, None)
+                if item is None:
+                    return
+                idx, img_path = item
+                pending.append((idx, executor.submit(_load_video_frame, img_path, (w, h), normalizers, interpolation)))
+        
+        fill()
+        while pending:
+            idx, future = pending.popleft()
+            start = time.perf_counter()
+            frame, elapsed = future.result()
+            wait_time += time.perf_counter() - start
+            decode_time += elapsed
+            fill()
+            
+            if frame is None:
+                continue
+            
+            start = time.perf_counter()
+            try:
+                out.write(frame)
+            except RuntimeError as e:
+                # ffmpeg è terminato: i frame già decodificati vengono scartati
+                error = str(e)
+                break
+            encode_time += time.perf_counter() - start
+            written += 1
+            
+            if progress_callback:
+                progress_callback((idx + 1) / total * 100)
+    
+    # cv2.VideoWriter.release() non restituisce nulla: conta solo l'esito di ffmpeg
+    ok = out.release() is not False and error is None
+    error = error or getattr(out, "error", None)
+    
+    if stats is not None:
+        stats.update(frames=written, decode_s=decode_time, encode_s=encode_time, wait_s=wait_time,
+                     backend=used_backend, error=error)
+    return ok
+
+def create_video_from_folder(folder, output_path, fps=25, resolution="1920x1080", codec="mp4v", progress_callback=None, interpolation="lanczos", prefetch=16, decode_workers=4, stats=None, backend="opencv", encoder="libx264", preset="medium", crf=23, resume=True):
+    """Crea un video da una cartella di frame con risoluzione e codec specificati"""
+    files = sorted([f for f in os.listdir(folder) 
+                    if f.lower().endswith(FRAME_EXTENSIONS)])
+    
+    return create_video_from_files([os.path.join(folder, f) for f in files], output_path,
+                                   fps, resolution, codec, progress_callback, interpolation,
+                                   prefetch, decode_workers, stats, backend, encoder, preset, crf, resume)
+
+def collect_interleaved_frames(folders):
+    """Raccoglie i frame di più cartelle (anche sottocartelle) in ordine casuale"""
+    frames = []
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for f in files:
+                if f.lower().endswith(FRAME_EXTENSIONS):
+                    frames.append(os.path.join(root, f))
+
+    random.shuffle(frames)
+    return frames
+
+# ioctl FICLONE di Linux (btrfs, xfs, ...): clona il file condividendo i blocchi
+_FICLONE = 0x40049409
+
+def _reflink_file(src, dst):
+    """Clona src in dst senza copiare i dati (ioctl FICLONE).
+
+    Solleva OSError se il filesystem (ad esempio ext4) o la piattaforma non
+    supportano il clone: in quel caso non viene copiato nulla.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.EOPNOTSUPP, "reflink non supportato", src)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+
+def _copy_file(src, dst):
+    """Copia src in un file dst nuovo. Un dst esistente viene rimosso prima:
+    dopo un'esecuzione con hardlink potrebbe condividere l'inode con un
+    sorgente, che shutil.copy sovrascriverebbe in place."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    shutil.copy(src, dst)
+
+def _place_file(src, dst, link_mode="copy"):
+    """Porta src in dst con il metodo richiesto; restituisce il metodo usato
+
+    link_mode: "copy", "hardlink", "reflink" oppure "auto" (reflink, poi
+    hardlink, poi copia). Se il metodo scelto fallisce (ad esempio tra
+    dispositivi diversi, o un reflink su ext4) si ripiega sulla copia, e
+    il valore restituito è "copy".
+    """
+    if link_mode == "copy":
+        _copy_file(src, dst)
+        return "copy"
+
+    if link_mode not in ("hardlink", "reflink", "auto"):
+        raise ValueError(f"Modalità di collegamento non supportata: {link_mode}")
+
+    attempts = ["reflink", "hardlink"] if link_mode == "auto" else [link_mode]
+    for method in attempts:
+        try:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            if method == "hardlink":
+                os.link(src, dst)
+            else:
+                _reflink_file(src, dst)
+            return method
+        except OSError:
+            continue
+
+    _copy_file(src, dst)
+    return "copy"
+
+def interleave_folders(folders, output_folder, fps=25, resolution="1920x1080", output_format="mp4", progress_callback=None, link_mode="copy", resume=True):
+    """Mescola i frame da più cartelle in ordine casuale
+
+    link_mode: vedi _place_file. Con "hardlink" i file di output condividono
+    l'inode con i sorgenti: modificarli in place (ad esempio con
+    apply_effects(overwrite=True)) modifica anche gli originali. Il reflink
+    invece è copy-on-write e non ha questo problema.
+    resume: riprende un'interfoliazione interrotta con lo stesso ordine
+    casuale, salvato nel manifest, saltando i frame già collocati. Dopo
+    un'esecuzione completata l'ordine viene sempre estratto di nuovo.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+
+    frames = collect_interleaved_frames(folders)
+
+    manifest = JobManifest(manifest_path(output_folder, "interleave_folders"), "interleave_folders",
+                           {"link_mode": link_mode}, resume)
+    # L'ordine casuale di un'esecuzione interrotta resta valido finché i frame sono gli stessi
+    if (manifest.plan is not None and not manifest.finished
+            and sorted(manifest.plan) == sorted(frames)):
+        frames = manifest.plan
+    else:
+        manifest.set_plan(frames)
+
+    total = len(frames)
+    with manifest:
+        for idx, src in enumerate(frames):
+            # L'estensione resta quella del sorgente (un .npy non è un PNG)
+            name = f"frame_{idx:06d}{os.path.splitext(src)[1].lower()}"
+            dst = os.path.join(output_folder, name)
+            if not manifest.is_done(name, src=src, out=dst):
+                # Un'esecuzione precedente può aver lasciato lo stesso indice con
+                # un'altra estensione: resterebbe nella cartella come frame in più
+                stem, ext = os.path.splitext(dst)
+                for other in FRAME_EXTENSIONS:
+                    if other != ext and os.path.lexists(stem + other):
+                        os.remove(stem + other)
+                _place_file(src, dst, link_mode)
+                manifest.mark_done(name, src=src, out=dst)
+            if progress_callback:
+                # Aggiornamento progresso per la sola fase di copia
+                progress_callback((idx + 1) / total * 100)
+        manifest.finish(True)
+    
+    return True